@@ -66,12 +66,14 @@ class AnimationPlayer:
                 )
                 all_frames.sort(key=lambda x: x[0])
 
-                last_time = 0
+                # Frames are due at absolute times from the start of the pass,
+                # so time spent sending never accumulates as drift
+                start_ns = time.monotonic_ns()
                 for time_ms, frame_type, frame in all_frames:
                     # Handle timing
-                    time_diff = (time_ms - last_time) / 1000
-                    if time_diff > 0:
-                        time.sleep(time_diff)
+                    delay_ns = start_ns + time_ms * 1_000_000 - time.monotonic_ns()
+                    if delay_ns > 0:
+                        time.sleep(delay_ns / 1e9)
 
                     # Apply frame
                     if frame_type == "eye":
@@ -113,8 +115,6 @@ class AnimationPlayer:
                             self.send_mouth_position(frame.position)
                             self.current_mouth_position = frame.position
 
-                    last_time = time_ms
-
                 if not loop:
                     break
 
@@ -3,21 +3,19 @@ Shared protocol definitions for animation control system.
 Handles file formats and UDP message encoding/decoding.
 """
 
-import struct
-from dataclasses import dataclass
-from typing import List, Tuple, Dict, Optional
-import csv
-from enum import Enum
-
 import struct
 from dataclasses import dataclass
 from typing import List, Tuple, Dict, Optional, BinaryIO
 import csv
+from enum import Enum
 import zipfile
 import io
 import json
 import os
 from datetime import datetime
+from heapq import merge
+from itertools import islice
+from operator import itemgetter
 
 
 class CommandType(Enum):
@@ -59,7 +57,7 @@ class AnimationBundle:
     metadata: dict  # For storing additional info like duration, creation date, etc.
 
 
-@dataclass
+@dataclass(slots=True)
 class EyeFrame:
     """Represents a single frame of eye animation data"""
 
@@ -71,7 +69,7 @@ class EyeFrame:
     both_closed: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class MouthFrame:
     """Represents a single frame of mouth animation data"""
 
@@ -86,6 +84,8 @@ class FileFormat:
     MANIFEST_NAME = "manifest.json"
     ANIMATION_NAME = "animation.csv"
     AUDIO_NAME = "audio.dat"
+    CSV_BUFFER_SIZE = 1 << 23  # Write buffer for CSV exports, in bytes
+    CSV_BATCH_ROWS = 1000  # Rows handed to csv.writer per writerows call
 
     @staticmethod
     def save_bundle(
@@ -206,8 +206,12 @@ class FileFormat:
             return False
 
     @staticmethod
-    def load_bundle(filename: str) -> Optional[AnimationBundle]:
-        """Load animation bundle file"""
+    def load_bundle(filename: str, frames: bool = True) -> Optional[AnimationBundle]:
+        """Load animation bundle file
+
+        With frames=False the frame lists are left empty, for callers that
+        stream the rows through iter_bundle() instead.
+        """
         try:
             with zipfile.ZipFile(filename, "r") as bundle:
                 # Load manifest
@@ -220,49 +224,16 @@ class FileFormat:
                     else None
                 )
 
-                # Load pre-sorted animation data
-                animation_csv = io.StringIO(
-                    bundle.read(FileFormat.ANIMATION_NAME).decode("utf-8")
-                )
-                reader = csv.DictReader(animation_csv)
-
+                # Load pre-sorted animation data, decoded as it is read
                 eye_frames = []
                 mouth_frames = []
-
-                # Data is already sorted by time_ms from save
-                for row in reader:
-                    time_ms = int(float(row["time_ms"]))
-
-                    if row["type"] == "eye":
-                        eye_frames.append(
-                            EyeFrame(
-                                time_ms=time_ms,
-                                x=(
-                                    float(row["eye_x"])
-                                    if row["eye_x"] != "None"
-                                    else 0.5
-                                ),
-                                y=(
-                                    float(row["eye_y"])
-                                    if row["eye_y"] != "None"
-                                    else 0.5
-                                ),
-                                left_closed=row["left_eye_closed"].lower() == "true",
-                                right_closed=row["right_eye_closed"].lower() == "true",
-                                both_closed=row["both_eyes_closed"].lower() == "true",
-                            )
-                        )
-                    elif row["type"] == "mouth":
-                        mouth_frames.append(
-                            MouthFrame(
-                                time_ms=time_ms,
-                                position=(
-                                    int(float(row["mouth_position"]))
-                                    if row["mouth_position"] != "None"
-                                    else 128
-                                ),
-                            )
-                        )
+                if frames:
+                    with bundle.open(FileFormat.ANIMATION_NAME) as animation_csv:
+                        for kind, frame in FileFormat._bundle_frames(animation_csv):
+                            if kind == "eye":
+                                eye_frames.append(frame)
+                            else:
+                                mouth_frames.append(frame)
 
                 return AnimationBundle(
                     audio_file=manifest.get("audio_file"),
@@ -276,59 +247,111 @@ class FileFormat:
             print(f"Error loading bundle: {e}")
             raise
 
+    @staticmethod
+    def iter_bundle(filename: str):
+        """Yield ("eye" or "mouth", frame) for each animation row of a bundle
+
+        Rows are decoded straight from the archive, so neither the CSV text
+        nor a list of all frames is ever held in memory.
+        """
+        with zipfile.ZipFile(filename, "r") as bundle:
+            with bundle.open(FileFormat.ANIMATION_NAME) as animation_csv:
+                yield from FileFormat._bundle_frames(animation_csv)
+
+    @staticmethod
+    def _bundle_frames(animation_csv: BinaryIO):
+        """Parse the animation CSV of a bundle into ("eye"/"mouth", frame)"""
+        reader = csv.DictReader(
+            io.TextIOWrapper(animation_csv, encoding="utf-8", newline="")
+        )
+
+        # Data is already sorted by time_ms from save
+        for row in reader:
+            time_ms = int(float(row["time_ms"]))
+
+            if row["type"] == "eye":
+                yield "eye", EyeFrame(
+                    time_ms=time_ms,
+                    x=float(row["eye_x"]) if row["eye_x"] != "None" else 0.5,
+                    y=float(row["eye_y"]) if row["eye_y"] != "None" else 0.5,
+                    left_closed=row["left_eye_closed"].lower() == "true",
+                    right_closed=row["right_eye_closed"].lower() == "true",
+                    both_closed=row["both_eyes_closed"].lower() == "true",
+                )
+            elif row["type"] == "mouth":
+                yield "mouth", MouthFrame(
+                    time_ms=time_ms,
+                    position=(
+                        int(float(row["mouth_position"]))
+                        if row["mouth_position"] != "None"
+                        else 128
+                    ),
+                )
+
     @staticmethod
     def save_to_csv(
         filename: str, eye_data: List[Tuple], mouth_data: List[Tuple]
     ) -> bool:
         """Save eye and mouth animation data to CSV file"""
         try:
-            with open(filename, "w", newline="") as csvfile:
-                writer = csv.writer(csvfile)
-
-                # Write header
-                header = ["time_ms", "type"]
-                if eye_data:
-                    header.extend(
-                        [
-                            "eye_x",
-                            "eye_y",
-                            "left_eye_closed",
-                            "right_eye_closed",
-                            "both_eyes_closed",
-                        ]
-                    )
-                if mouth_data:
-                    header.append("mouth_position")
-                writer.writerow(header)
-
-                # Combine and sort all data
-                all_data = []
-
-                # Add eye data
-                for time_ms, x, y, left_blink, right_blink, both_eyes in eye_data:
-                    row = [time_ms, "eye", x, y, left_blink, right_blink, both_eyes]
-                    if mouth_data:
-                        row.append(None)  # Placeholder for mouth position
-                    all_data.append(row)
-
-                # Add mouth data
-                for time_ms, position in mouth_data:
-                    if eye_data:
-                        row = [time_ms, "mouth", None, None, None, None, None, position]
-                    else:
-                        row = [time_ms, "mouth", position]
-                    all_data.append(row)
-
-                # Sort by timestamp and write
-                all_data.sort(key=lambda x: x[0])
-                writer.writerows(all_data)
-
+            with open(
+                filename, "w", newline="", buffering=FileFormat.CSV_BUFFER_SIZE
+            ) as csvfile:
+                FileFormat.save_to_csv_stream(csvfile, eye_data, mouth_data)
             return True
 
         except Exception as e:
             print(f"Error saving file: {e}")
             return False
 
+    @staticmethod
+    def save_to_csv_stream(csvfile, eye_data, mouth_data) -> None:
+        """Write eye and mouth animation data as CSV to an open text file
+
+        Both tracks are in time order already, so their rows are merged
+        lazily and written in batches instead of collected and sorted first.
+        """
+        writer = csv.writer(csvfile)
+
+        # Write header
+        header = ["time_ms", "type"]
+        if eye_data:
+            header.extend(
+                [
+                    "eye_x",
+                    "eye_y",
+                    "left_eye_closed",
+                    "right_eye_closed",
+                    "both_eyes_closed",
+                ]
+            )
+        if mouth_data:
+            header.append("mouth_position")
+        writer.writerow(header)
+
+        # Eye rows get a placeholder for the mouth position
+        eye_tail = (None,) if mouth_data else ()
+        eye_rows = (
+            (time_ms, "eye", x, y, left_blink, right_blink, both_eyes, *eye_tail)
+            for time_ms, x, y, left_blink, right_blink, both_eyes in eye_data
+        )
+
+        # Mouth rows skip the eye columns when there are any
+        mouth_gap = (None,) * 5 if eye_data else ()
+        mouth_rows = (
+            (time_ms, "mouth", *mouth_gap, position)
+            for time_ms, position in mouth_data
+        )
+
+        # Merge by timestamp, eye rows first on ties, and write
+        rows = merge(eye_rows, mouth_rows, key=itemgetter(0))
+        batch_rows = FileFormat.CSV_BATCH_ROWS
+        while True:
+            batch = list(islice(rows, batch_rows))
+            if not batch:
+                break
+            writer.writerows(batch)
+
     @staticmethod
     def load_from_csv(filename: str) -> Tuple[List[EyeFrame], List[MouthFrame]]:
         """Load eye and mouth animation data from CSV file"""
@@ -374,6 +397,12 @@ class FileFormat:
         return eye_frames, mouth_frames
 
 
+# Every possible mouth packet, indexed by position, so senders never build one
+MOUTH_PACKETS = tuple(
+    CommandType.MOUTH_POSITION.code + bytes((position,)) for position in range(256)
+)
+
+
 class UDPProtocol:
     """Handles encoding and decoding of UDP messages"""
 
@@ -387,7 +416,7 @@ class UDPProtocol:
     @staticmethod
     def encode_mouth_message(position: int) -> bytes:
         """Encode a message for the mouth controller"""
-        return CommandType.MOUTH_POSITION.code + struct.pack("B", position)
+        return MOUTH_PACKETS[position]
 
     @staticmethod
     def encode_eye_position(x: float, y: float) -> bytes:
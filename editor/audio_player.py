@@ -1,3 +1,4 @@
+import io
 import pygame
 import time
 from pydub import AudioSegment
@@ -8,9 +9,10 @@ class AudioPlayer:
         pygame.mixer.init()
         self.loaded = False
         self.duration = 0  # Duration in milliseconds
-        self.start_time = None
-        self.paused_time = 0  # Time elapsed before pausing
+        self.start_ns = None  # monotonic_ns() when playback last (re)started
+        self.paused_ns = 0  # Time elapsed before pausing, in nanoseconds
         self.current_file_path = None  # Add this to track the current file path
+        self._buffer = None  # In-memory source the mixer streams from
 
     def load_file(self, file_path):
         try:
@@ -27,31 +29,49 @@ class AudioPlayer:
             self.current_file_path = None
             return False
 
+    def load_bytes(self, data, audio_format):
+        """Load audio held in memory, such as the audio of a bundle"""
+        try:
+            # The mixer streams from the file object, so keep it alive
+            self._buffer = io.BytesIO(data)
+            pygame.mixer.music.load(self._buffer, f"audio.{audio_format}")
+            self.loaded = True
+            audio = AudioSegment.from_file(io.BytesIO(data), format=audio_format)
+            self.duration = len(audio)  # Duration in milliseconds
+            self.current_file_path = None  # There is no file to bundle again
+            return True
+        except Exception as e:
+            print(f"Error loading audio data: {e}")
+            self.loaded = False
+            self._buffer = None
+            self.current_file_path = None
+            return False
+
     def play(self):
         if self.loaded:
             pygame.mixer.music.play()
-            self.start_time = time.time() * 1000  # Record start time in milliseconds
-            self.paused_time = 0
+            self.start_ns = time.monotonic_ns()  # Record start time
+            self.paused_ns = 0
 
     def pause(self):
         if self.loaded:
             pygame.mixer.music.pause()
-            if self.start_time:
+            if self.start_ns is not None:
                 # Calculate time elapsed until pause
-                self.paused_time += time.time() * 1000 - self.start_time
-                self.start_time = None
+                self.paused_ns += time.monotonic_ns() - self.start_ns
+                self.start_ns = None
 
     def unpause(self):
         if self.loaded:
             pygame.mixer.music.unpause()
-            if not self.start_time:
-                self.start_time = time.time() * 1000  # Record new start time
+            if self.start_ns is None:
+                self.start_ns = time.monotonic_ns()  # Record new start time
 
     def stop(self):
         if self.loaded:
             pygame.mixer.music.stop()
-        self.start_time = None
-        self.paused_time = 0
+        self.start_ns = None
+        self.paused_ns = 0
 
     def unload(self):
         """Unload the current audio file"""
@@ -70,9 +90,10 @@ class AudioPlayer:
 
             self.loaded = False
             self.duration = 0
-            self.start_time = None
-            self.paused_time = 0
+            self.start_ns = None
+            self.paused_ns = 0
             self.current_file_path = None
+            self._buffer = None
 
     def get_current_file(self):
         """Get the path of the currently loaded audio file"""
@@ -86,15 +107,15 @@ class AudioPlayer:
 
     def get_position(self):
         if self.loaded:
-            if self.start_time:
+            elapsed_ns = self.paused_ns
+            if self.start_ns is not None:
                 # Calculate current position
-                current_time = time.time() * 1000
-                position = self.paused_time + (current_time - self.start_time)
-                if position > self.duration:
-                    return self.duration
-                return position
-            else:
-                return self.paused_time
+                elapsed_ns += time.monotonic_ns() - self.start_ns
+            # Whole milliseconds in integer math, no float drift
+            position = elapsed_ns // 1_000_000
+            if position > self.duration:
+                return self.duration
+            return position
         else:
             return 0
 
@@ -8,9 +8,10 @@ from typing import Optional, List, Dict
 import pygame
 import tempfile
 import os
-from animation_protocol import FileFormat, CommandType
+from animation_protocol import FileFormat, CommandType, UDPProtocol
 from queue import Queue, Empty
 import threading
+from bisect import bisect_right
 
 
 class BundlePlayer:
@@ -25,8 +26,9 @@ class BundlePlayer:
         self.mouth_port = mouth_port
         self.start_delay_ms = start_delay_ms
 
-        # Initialize running state first
-        self.running = True
+        # Initialize running state first; set once cleanup() starts, and
+        # waited on instead of sleeping so the worker thread exits promptly
+        self._stop = threading.Event()
 
         # Initialize state
         self.initialize_state()
@@ -47,10 +49,13 @@ class BundlePlayer:
         # Animation state
         self.eye_data = []
         self.mouth_data = []
+        # Frame timestamps, parallel to eye_data/mouth_data, for bisecting
+        self.eye_times = []
+        self.mouth_times = []
         self.is_playing = False
         self.is_auto_movement = True
         self.current_time = 0
-        self.recording_start_time = 0
+        self.recording_start_ns = 0  # monotonic_ns() at playback start
         self.current_audio = None
 
     def initialize_networking(self):
@@ -98,9 +103,11 @@ class BundlePlayer:
 
     def _process_button_commands(self):
         """Process button commands with retries"""
-        while self.running:
+        stop = self._stop
+        while not stop.is_set():
             try:
-                command = self.button_command_queue.get(timeout=0.1)  # 100ms timeout
+                # Blocks until there is work; cleanup() wakes us with None
+                command = self.button_command_queue.get()
                 if command is None:  # Sentinel value for shutdown
                     break
                 # Send command multiple times to ensure delivery
@@ -109,15 +116,12 @@ class BundlePlayer:
                         self.send_eye_command(*command)
                     else:
                         self.send_eye_command(command)
-                    time.sleep(0.01)  # 10ms between sends
-                time.sleep(0.04)  # 40ms before next command
+                    if stop.wait(0.01):  # 10ms between sends
+                        break
+                stop.wait(0.04)  # 40ms before next command
                 self.button_command_queue.task_done()
-            except Empty:  # Fixed exception
-                continue  # Keep running if queue is empty
             except Exception as e:
                 print(f"Error processing button command: {e}")
-                if not self.running:
-                    break
 
     def send_eye_command(self, command_type: CommandType, *args):
         try:
@@ -157,17 +161,18 @@ class BundlePlayer:
 
             self.eye_socket.sendto(message, (self.host, self.eye_port))
         except Exception as e:
-            if self.running:  # Only print errors if we're still supposed to be running
+            # Only print errors if we're still supposed to be running
+            if not self._stop.is_set():
                 print(f"Error sending eye command: {e}", file=sys.stderr)
 
     def send_mouth_position(self, position: int):
         try:
             if not self.mouth_socket:
                 return
-            message = b"\x50" + struct.pack("B", position)
+            message = UDPProtocol.encode_mouth_message(position)
             self.mouth_socket.sendto(message, (self.host, self.mouth_port))
         except Exception as e:
-            if self.running:
+            if not self._stop.is_set():
                 print(f"Error sending mouth command: {e}", file=sys.stderr)
 
     def prepare_bundle(self, filename: str) -> bool:
@@ -205,6 +210,8 @@ class BundlePlayer:
             self.mouth_data = [
                 (frame.time_ms, frame.position) for frame in bundle.mouth_frames
             ]
+            self.eye_times = [frame[0] for frame in self.eye_data]
+            self.mouth_times = [frame[0] for frame in self.mouth_data]
 
             # Reset playback state
             self.current_time = 0
@@ -236,23 +243,20 @@ class BundlePlayer:
             return False
 
     def apply_eye_movement(self, current_time):
-        """Using EyeController's command queue for eye movements"""
-        frame_to_play = None
-        for frame in self.eye_data:
-            if frame[0] <= current_time:
-                frame_to_play = frame
-            else:
-                break
+        """Send eye movements, queueing blinks for repeated delivery"""
+        # Latest frame with time <= current_time
+        idx = bisect_right(self.eye_times, current_time) - 1
 
-        if frame_to_play:
-            time_ms, x, y, left_blink, right_blink, both_eyes = frame_to_play
+        if idx >= 0:
+            time_ms, x, y, left_blink, right_blink, both_eyes = self.eye_data[idx]
 
-            # Queue eye position command
+            # Send eye position straight away; only the latest one matters,
+            # so it doesn't go through the paced, repeated command queue
             if (x != self.current_eye_x) or (y != self.current_eye_y):
                 self.current_eye_x = x
                 self.current_eye_y = y
-                self.button_command_queue.put(
-                    (CommandType.EYE_POSITION, int(x * 255), int(y * 255))
+                self.send_eye_command(
+                    CommandType.EYE_POSITION, int(x * 255), int(y * 255)
                 )
 
             # Queue blink commands
@@ -277,15 +281,10 @@ class BundlePlayer:
                     self.right_eye_closed = right_blink
 
     def apply_mouth_movement(self, current_time):
-        frame_to_play = None
-        for frame in self.mouth_data:
-            if frame[0] <= current_time:
-                frame_to_play = frame
-            else:
-                break
+        idx = bisect_right(self.mouth_times, current_time) - 1
 
-        if frame_to_play:
-            time_ms, position = frame_to_play
+        if idx >= 0:
+            time_ms, position = self.mouth_data[idx]
             if position != self.current_mouth_position:
                 self.current_mouth_position = position
                 self.send_mouth_position(position)
@@ -303,8 +302,8 @@ class BundlePlayer:
                 if not pygame.mixer.music.get_busy():
                     return False
             else:
-                current_time_ms = (time.time() - self.recording_start_time) * 1000
-                self.current_time = int(current_time_ms)
+                elapsed_ns = time.monotonic_ns() - self.recording_start_ns
+                self.current_time = elapsed_ns // 1_000_000
 
                 max_time = 0
                 if self.eye_data:
@@ -328,7 +327,7 @@ class BundlePlayer:
                     self.disable_auto_movement()
 
                 self.is_playing = True
-                self.recording_start_time = time.time()
+                self.recording_start_ns = time.monotonic_ns()
 
                 if self.current_audio:
                     print("Starting audio playback")
@@ -380,7 +379,7 @@ class BundlePlayer:
         """Final cleanup when shutting down"""
         print("\nFinal cleanup...")
 
-        self.running = False
+        self._stop.set()
         if (
             hasattr(self, "button_command_thread")
             and self.button_command_thread.is_alive()
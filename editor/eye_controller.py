@@ -1,20 +1,106 @@
+import logging
+import numpy as np
 import socket
-import time
 import threading
-import struct
-from typing import Optional
 from queue import Queue
+from animation_protocol import CommandType
+from joystick_controller import DIRTY_BUTTONS, DIRTY_LEFT_STICK, DIRTY_RIGHT_Y
+
+# Precomputed reciprocals for the stick mapping (0-255 raw axis values)
+_INV_255 = 1.0 / 255.0
+_INV_256 = 1.0 / 256.0
+
+# Deadzone in raw axis counts around the 128 center (10% of half range)
+_STICK_DEADZONE = 0.1 * 128
+
+# Bits of EyeController.button_bits, one per blink button
+BUTTON_LEFT = 1  # BTN_WEST, left eye
+BUTTON_RIGHT = 2  # BTN_EAST, right eye
+BUTTON_BOTH = 4  # BTN_SOUTH, both eyes
+
+# Playback only sends eye moves smaller than this once the last send is at
+# least _PLAYBACK_RESEND_MS old (~30 Hz, what the eye device keeps up with)
+_PLAYBACK_MIN_DELTA = 0.005
+_PLAYBACK_RESEND_MS = 33
+
+# Bound %-format templates for the per-frame commands; cheaper than f-strings
+_JOYSTICK_CMD = "joystick,%.2f,%.2f".__mod__
+_LEFT_EYELID_CMD = "left_eyelid,%.2f".__mod__
+_RIGHT_EYELID_CMD = "right_eyelid,%.2f".__mod__
+
+# Commands without arguments map directly to their wire code
+_FIXED_COMMANDS = {
+    "joystick_connected": CommandType.JOYSTICK_CONNECTED.code,
+    "joystick_disconnected": CommandType.JOYSTICK_DISCONNECTED.code,
+    "auto_movement_on": CommandType.AUTO_MOVEMENT_ON.code,
+    "auto_movement_off": CommandType.AUTO_MOVEMENT_OFF.code,
+    "auto_blink_on": CommandType.AUTO_BLINK_ON.code,
+    "auto_blink_off": CommandType.AUTO_BLINK_OFF.code,
+    "auto_pupil_on": CommandType.AUTO_PUPIL_ON.code,
+    "auto_pupil_off": CommandType.AUTO_PUPIL_OFF.code,
+    "blink_left_start": CommandType.BLINK_LEFT_START.code,
+    "blink_left_end": CommandType.BLINK_LEFT_END.code,
+    "blink_right_start": CommandType.BLINK_RIGHT_START.code,
+    "blink_right_end": CommandType.BLINK_RIGHT_END.code,
+    "blink_both_start": CommandType.BLINK_BOTH_START.code,
+    "blink_both_end": CommandType.BLINK_BOTH_END.code,
+}
+
+# Per-frame diagnostics go to debug; the editor's verbose toggle sets the level
+log = logging.getLogger(__name__)
+
+
+def _encode_message(command):
+    """Encode a "name[,arg...]" command string into its UDP packet"""
+    code = _FIXED_COMMANDS.get(command)
+    if code is not None:
+        return code
+
+    name, *args = command.split(",")
+    if name == "joystick":
+        x, y = args
+        return bytes((0x20, int(float(x) * 255), int(float(y) * 255)))
+    elif name == "left_eyelid":
+        (position,) = args
+        return bytes((0x30, int(float(position) * 255)))
+    elif name == "right_eyelid":
+        (position,) = args
+        return bytes((0x31, int(float(position) * 255)))
+    raise ValueError(f"Unknown command: {command}")
 
 
 class EyeController:
+    __slots__ = (
+        "UDP_IP",
+        "UDP_PORT",
+        "sock",
+        "_joystick_enabled",
+        "current_eye_x",
+        "current_eye_y",
+        "current_eyelid",
+        "left_eye_closed",
+        "right_eye_closed",
+        "_last_sent_ms",
+        "button_command_queue",
+        "button_command_thread",
+        "_stop",
+        "button_bits",
+        "sample",
+        "joystick_controller",
+        "__weakref__",  # Joystick subscriptions hold the handler weakly
+    )
+
     def __init__(self, ip: str, port: int, joystick_controller):
         # Socket setup
         self.UDP_IP = ip
         self.UDP_PORT = port
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        # Never let a full send buffer stall the joystick/playback path
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20)
+        self.sock.setblocking(False)
 
         # Control state
-        self.joystick_enabled = True
+        self._joystick_enabled = True
 
         # State variables
         self.current_eye_x = 0.5
@@ -22,20 +108,23 @@ class EyeController:
         self.current_eyelid = 0
         self.left_eye_closed = False
         self.right_eye_closed = False
+        self._last_sent_ms = 0  # Playback time of the last eye position send
 
-        # Button command handling
+        # Button command handling; _stop is waited on instead of sleeping so
+        # the worker thread exits as soon as cleanup() sets it
+        self._stop = threading.Event()
         self.button_command_queue = Queue()
         self.button_command_thread = threading.Thread(
             target=self._process_button_commands, daemon=True
         )
         self.button_command_thread.start()
 
-        # Button state tracking for recording
-        self.prev_button_states = {
-            "BTN_WEST": 0,  # Left eye
-            "BTN_EAST": 0,  # Right eye
-            "BTN_SOUTH": 0,  # Both eyes
-        }
+        # Button state tracking for recording, as BUTTON_* bits
+        self.button_bits = 0
+
+        # (x, y, button_bits) as one tuple, republished by the joystick
+        # thread with a single store so the editor never reads a torn frame
+        self.sample = (self.current_eye_x, self.current_eye_y, 0)
 
         # Subscribe to joystick
         self.joystick_controller = joystick_controller
@@ -51,57 +140,75 @@ class EyeController:
 
     def _process_button_commands(self):
         """Process button commands with retries"""
-        while True:
+        stop = self._stop
+        while not stop.is_set():
             try:
                 command = self.button_command_queue.get()
+                if command is None:  # Sentinel from cleanup()
+                    break
                 # Send command multiple times to ensure delivery
                 for _ in range(2):
                     self.send_message(command)
-                    time.sleep(0.01)  # 10ms between sends
-                time.sleep(0.04)  # 40ms before next command
+                    if stop.wait(0.01):  # 10ms between sends
+                        break
+                stop.wait(0.04)  # 40ms before next command
                 self.button_command_queue.task_done()
             except Exception as e:
                 print(f"EyeController: Error processing button command: {e}")
 
-    def _handle_joystick_update(self, state):
-        """Handle joystick state updates"""
+    def _handle_joystick_update(self, state, mask):
+        """Handle joystick state updates, only for the parts flagged in mask"""
         try:
-            if self.joystick_enabled:
+            if not self.joystick_enabled:
+                return
+
+            if mask & DIRTY_BUTTONS:
+                # Hoist hot attributes into locals for the button checks
+                queue_command = self.button_command_queue.put
+                btn_west = state.btn_west
+                btn_east = state.btn_east
+                btn_south = state.btn_south
+
                 # Update button states for recording
-                if state.btn_west != self.prev_button_states["BTN_WEST"]:
-                    self.prev_button_states["BTN_WEST"] = state.btn_west
-                    self.button_command_queue.put(
-                        "blink_left_start" if state.btn_west else "blink_left_end"
-                    )
-                    self.left_eye_closed = bool(state.btn_west)
+                bits = (
+                    (BUTTON_LEFT if btn_west else 0)
+                    | (BUTTON_RIGHT if btn_east else 0)
+                    | (BUTTON_BOTH if btn_south else 0)
+                )
+                changed = bits ^ self.button_bits
+                self.button_bits = bits
 
-                if state.btn_east != self.prev_button_states["BTN_EAST"]:
-                    self.prev_button_states["BTN_EAST"] = state.btn_east
-                    self.button_command_queue.put(
-                        "blink_right_start" if state.btn_east else "blink_right_end"
+                if changed & BUTTON_LEFT:
+                    queue_command("blink_left_start" if btn_west else "blink_left_end")
+                    self.left_eye_closed = bool(btn_west)
+
+                if changed & BUTTON_RIGHT:
+                    queue_command(
+                        "blink_right_start" if btn_east else "blink_right_end"
                     )
-                    self.right_eye_closed = bool(state.btn_east)
+                    self.right_eye_closed = bool(btn_east)
 
-                if state.btn_south != self.prev_button_states["BTN_SOUTH"]:
-                    self.prev_button_states["BTN_SOUTH"] = state.btn_south
-                    if state.btn_south:
-                        self.button_command_queue.put("blink_both_start")
+                if changed & BUTTON_BOTH:
+                    if btn_south:
+                        queue_command("blink_both_start")
                         self.left_eye_closed = self.right_eye_closed = True
                     else:
-                        self.button_command_queue.put("blink_both_end")
+                        queue_command("blink_both_end")
                         self.left_eye_closed = self.right_eye_closed = False
 
-                # Handle eye position (left stick)
-                x = (state.left_x - 128) / 128.0
-                y = (state.left_y - 128) / 128.0
-
-                # Add deadzone
-                x = x if abs(x) > 0.1 else 0
-                y = y if abs(y) > 0.1 else 0
-
-                # Map to 0-1 range
-                eye_x = (x + 1) / 2
-                eye_y = (-y + 1) / 2  # Invert Y axis
+            if mask & DIRTY_LEFT_STICK:
+                # Handle eye position (left stick), mapped straight to the
+                # 0-1 range: ((v - 128) / 128 + 1) / 2 == v / 256
+                left_x = state.left_x
+                left_y = state.left_y
+                eye_x = (
+                    left_x * _INV_256 if abs(left_x - 128) > _STICK_DEADZONE else 0.5
+                )
+                eye_y = (  # Invert Y axis
+                    1.0 - left_y * _INV_256
+                    if abs(left_y - 128) > _STICK_DEADZONE
+                    else 0.5
+                )
 
                 # Send position if changed significantly
                 if (
@@ -110,83 +217,77 @@ class EyeController:
                 ):
                     self.current_eye_x = eye_x
                     self.current_eye_y = eye_y
-                    self.send_message(f"joystick,{eye_x:.2f},{eye_y:.2f}")
+                    self.send_message(_JOYSTICK_CMD((eye_x, eye_y)))
 
+            if mask & (DIRTY_BUTTONS | DIRTY_LEFT_STICK):
+                self.sample = (self.current_eye_x, self.current_eye_y, self.button_bits)
+
+            if mask & DIRTY_RIGHT_Y:
                 # Handle eyelid position (right stick)
-                eyelid_pos = (255 - state.right_y) / 255.0
+                eyelid_pos = (255 - state.right_y) * _INV_255
                 if abs(eyelid_pos - self.current_eyelid) > 0.05:
                     self.current_eyelid = eyelid_pos
-                    self.send_message(f"left_eyelid,{eyelid_pos:.2f}")
-                    self.send_message(f"right_eyelid,{eyelid_pos:.2f}")
+                    send = self.send_message
+                    send(_LEFT_EYELID_CMD(eyelid_pos))
+                    send(_RIGHT_EYELID_CMD(eyelid_pos))
 
         except Exception as e:
             print(f"EyeController: Error handling joystick update: {e}")
 
+    @property
+    def joystick_enabled(self):
+        """Whether the stick drives the eyes; off while playback does"""
+        return self._joystick_enabled
+
+    @joystick_enabled.setter
+    def joystick_enabled(self, enabled):
+        self._joystick_enabled = enabled
+        if enabled:
+            # Playback moved the eyes without joystick events, so a still
+            # stick would otherwise leave sample at its pre-playback value
+            self.sample = (self.current_eye_x, self.current_eye_y, self.button_bits)
+
     def encode_message(self, command):
         """Encode command messages for UDP transmission"""
-        if command == "joystick_connected":
-            return b"\x01"
-        elif command == "joystick_disconnected":
-            return b"\x00"
-        elif command == "auto_movement_on":
-            return b"\x11"
-        elif command == "auto_movement_off":
-            return b"\x10"
-        elif command == "auto_blink_on":
-            return b"\x13"
-        elif command == "auto_blink_off":
-            return b"\x12"
-        elif command == "auto_pupil_on":
-            return b"\x15"
-        elif command == "auto_pupil_off":
-            return b"\x14"
-        elif command.startswith("joystick"):
-            _, x, y = command.split(",")
-            x_byte = int(float(x) * 255)
-            y_byte = int(float(y) * 255)
-            return b"\x20" + struct.pack("BB", x_byte, y_byte)
-        elif command.startswith("left_eyelid"):
-            _, position = command.split(",")
-            pos_byte = int(float(position) * 255)
-            return b"\x30" + struct.pack("B", pos_byte)
-        elif command.startswith("right_eyelid"):
-            _, position = command.split(",")
-            pos_byte = int(float(position) * 255)
-            return b"\x31" + struct.pack("B", pos_byte)
-        elif command == "blink_left_start":
-            return b"\x40"
-        elif command == "blink_left_end":
-            return b"\x41"
-        elif command == "blink_right_start":
-            return b"\x42"
-        elif command == "blink_right_end":
-            return b"\x43"
-        elif command == "blink_both_start":
-            return b"\x44"
-        elif command == "blink_both_end":
-            return b"\x45"
-        else:
-            raise ValueError(f"Unknown command: {command}")
-
-    def apply_recorded_movement(self, current_time, eye_data):
-        """Apply recorded eye movements during playback"""
+        return _encode_message(command)
+
+    def apply_recorded_movement(self, current_time, times, values):
+        """Apply recorded eye movements during playback
+
+        times holds the sorted frame timestamps and values one row per frame
+        of (x, y, left_blink, right_blink, both_eyes).
+        """
         if not self.joystick_enabled:  # Only apply during playback
-            frame_to_play = None
-            for frame in eye_data:
-                if frame[0] <= current_time:
-                    frame_to_play = frame
-                else:
-                    break
+            # Latest frame with time <= current_time
+            idx = int(np.searchsorted(times, current_time, side="right")) - 1
+
+            if idx >= 0:
+                left_blink, right_blink, both_eyes = (values[idx, 2:] != 0).tolist()
 
-            if frame_to_play:
-                time_ms, x, y, left_blink, right_blink, both_eyes = frame_to_play
+                # Interpolate the position towards the next frame, whose time
+                # is strictly after current_time
+                xy = values[idx, :2]
+                if idx + 1 < len(times):
+                    t0 = times[idx]
+                    frac = (current_time - t0) / (times[idx + 1] - t0)
+                    xy = xy + (values[idx + 1, :2] - xy) * frac
+                x, y = xy.tolist()
 
-                # Apply eye position
-                if (x != self.current_eye_x) or (y != self.current_eye_y):
+                # Apply eye position, throttling tiny moves to ~30 Hz
+                dx = abs(x - self.current_eye_x)
+                dy = abs(y - self.current_eye_y)
+                if (dx or dy) and (
+                    dx >= _PLAYBACK_MIN_DELTA
+                    or dy >= _PLAYBACK_MIN_DELTA
+                    or not 0 <= current_time - self._last_sent_ms < _PLAYBACK_RESEND_MS
+                ):
                     self.current_eye_x = x
                     self.current_eye_y = y
-                    self.send_message(f"joystick,{x:.2f},{y:.2f}")
-                    print(f"Applied eye position: X={x:.2f}, Y={y:.2f}")
+                    self.sample = (x, y, self.button_bits)
+                    self._last_sent_ms = current_time
+                    self.send_message(_JOYSTICK_CMD((x, y)))
+                    if log.isEnabledFor(logging.DEBUG):
+                        log.debug("Applied eye position: X=%.2f, Y=%.2f", x, y)
 
                 # Apply blink states
                 if both_eyes:
@@ -205,16 +306,24 @@ class EyeController:
                         )
                         self.right_eye_closed = right_blink
 
-                print(
-                    f"Applied blink states - Left: {left_blink}, Right: {right_blink}, Both: {both_eyes}"
-                )
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug(
+                        "Applied blink states - Left: %s, Right: %s, Both: %s",
+                        left_blink,
+                        right_blink,
+                        both_eyes,
+                    )
 
     def send_message(self, message: str):
         """Send UDP message"""
         try:
             encoded_message = self.encode_message(message)
             self.sock.sendto(encoded_message, (self.UDP_IP, self.UDP_PORT))
-            print(f"EyeController: Sent {message}")
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("EyeController: Sent %s", message)
+        except BlockingIOError:
+            # Send buffer full: drop this update, the next one is fresher
+            pass
         except Exception as e:
             print(f"EyeController: Error sending message: {e}")
 
@@ -225,6 +334,11 @@ class EyeController:
         # Unsubscribe from joystick
         self.joystick_controller.unsubscribe(self._handle_joystick_update)
 
+        # Stop the button command thread; it wakes on the sentinel
+        self._stop.set()
+        self.button_command_queue.put(None)
+        self.button_command_thread.join(timeout=0.1)
+
         # End any active blinks
         if self.left_eye_closed:
             self.send_message("blink_left_end")
@@ -1,140 +1,362 @@
+import os
+import select
+import struct
 import threading
-import time
+import weakref
 from inputs import devices, get_gamepad
 from queue import Queue
-from dataclasses import dataclass
-from typing import Callable, Dict, List
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Linux struct input_event, read straight from the gamepad's event device
+_EVENT_FORMAT = "llHHi"
+_EVENT_SIZE = struct.calcsize(_EVENT_FORMAT)
+_EVENT_BATCH = 64
+EV_SYN, EV_KEY, EV_ABS = 0x00, 0x01, 0x03
+SYN_REPORT = 0x00
+
+# Snapshots handed to subscribers are reused round-robin from a pool this big
+# (a power of two). A slot is only written when it is published, at most once
+# per read, so the slot being filled is never the one _published points to,
+# and is only rewritten after POOL_SIZE - 1 newer publishes; subscribers run
+# synchronously and get_current_state() copies straight away
+_SNAPSHOT_POOL_SIZE = 4
+
+# Retry delays after a read error, doubling up to the cap while the error
+# persists (e.g. the pad was unplugged) and reset by the next good read
+_ERROR_BACKOFF_MIN = 0.1
+_ERROR_BACKOFF_MAX = 5.0
+
+# Dirty bits passed to subscribers alongside each state snapshot
+DIRTY_LEFT_X = 1 << 0
+DIRTY_LEFT_Y = 1 << 1
+DIRTY_RIGHT_X = 1 << 2
+DIRTY_RIGHT_Y = 1 << 3
+DIRTY_BTN_WEST = 1 << 4
+DIRTY_BTN_EAST = 1 << 5
+DIRTY_BTN_SOUTH = 1 << 6
+DIRTY_BTN_NORTH = 1 << 7
+DIRTY_LEFT_STICK = DIRTY_LEFT_X | DIRTY_LEFT_Y
+DIRTY_BUTTONS = DIRTY_BTN_WEST | DIRTY_BTN_EAST | DIRTY_BTN_SOUTH | DIRTY_BTN_NORTH
+
+# (type, code) -> (JoystickState field, dirty bit) for the raw event device path
+_EVDEV_FIELDS = {
+    (EV_ABS, 0x00): ("left_x", DIRTY_LEFT_X),  # ABS_X
+    (EV_ABS, 0x01): ("left_y", DIRTY_LEFT_Y),  # ABS_Y
+    (EV_ABS, 0x03): ("right_x", DIRTY_RIGHT_X),  # ABS_RX
+    (EV_ABS, 0x04): ("right_y", DIRTY_RIGHT_Y),  # ABS_RY
+    (EV_KEY, 0x134): ("btn_west", DIRTY_BTN_WEST),  # BTN_WEST
+    (EV_KEY, 0x131): ("btn_east", DIRTY_BTN_EAST),  # BTN_EAST
+    (EV_KEY, 0x130): ("btn_south", DIRTY_BTN_SOUTH),  # BTN_SOUTH
+    (EV_KEY, 0x133): ("btn_north", DIRTY_BTN_NORTH),  # BTN_NORTH
+}
+
+# inputs event code -> (JoystickState field, dirty bit) for get_gamepad()
+_INPUTS_FIELDS = {
+    "ABS_X": ("left_x", DIRTY_LEFT_X),
+    "ABS_Y": ("left_y", DIRTY_LEFT_Y),
+    "ABS_RX": ("right_x", DIRTY_RIGHT_X),
+    "ABS_RY": ("right_y", DIRTY_RIGHT_Y),
+    "BTN_WEST": ("btn_west", DIRTY_BTN_WEST),
+    "BTN_EAST": ("btn_east", DIRTY_BTN_EAST),
+    "BTN_SOUTH": ("btn_south", DIRTY_BTN_SOUTH),
+    "BTN_NORTH": ("btn_north", DIRTY_BTN_NORTH),
+}
 
 
-@dataclass
 class JoystickState:
-    """Data class to hold complete joystick state"""
+    """Slotted class to hold complete joystick state"""
+
+    __slots__ = (
+        "left_x",
+        "left_y",
+        "right_x",
+        "right_y",
+        "btn_west",
+        "btn_east",
+        "btn_south",
+        "btn_north",
+    )
+
+    def __init__(
+        self,
+        left_x: int = 128,
+        left_y: int = 128,
+        right_x: int = 128,
+        right_y: int = 128,
+        btn_west: int = 0,
+        btn_east: int = 0,
+        btn_south: int = 0,
+        btn_north: int = 0,
+    ):
+        # Analog sticks (0-255 range)
+        self.left_x = left_x
+        self.left_y = left_y
+        self.right_x = right_x
+        self.right_y = right_y
+
+        # Buttons (0 or 1)
+        self.btn_west = btn_west  # Square/X
+        self.btn_east = btn_east  # Circle/B
+        self.btn_south = btn_south  # X/A
+        self.btn_north = btn_north  # Triangle/Y
+
+    def copy(self) -> "JoystickState":
+        """Return a snapshot of this state without going through __init__"""
+        clone = object.__new__(JoystickState)
+        self.copy_into(clone)
+        return clone
+
+    def copy_into(self, other: "JoystickState"):
+        """Overwrite every field of other with this state"""
+        other.left_x = self.left_x
+        other.left_y = self.left_y
+        other.right_x = self.right_x
+        other.right_y = self.right_y
+        other.btn_west = self.btn_west
+        other.btn_east = self.btn_east
+        other.btn_south = self.btn_south
+        other.btn_north = self.btn_north
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)}" for name in self.__slots__)
+        return f"JoystickState({fields})"
+
+
+class _SafeCallback:
+    """Subscriber wrapper that reports exceptions instead of raising them"""
+
+    __slots__ = ("callback",)
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def __call__(self, state: JoystickState, mask: int):
+        try:
+            self.callback(state, mask)
+        except Exception as e:
+            print(f"JoystickController: Error notifying subscriber: {e}")
+
+    def __eq__(self, other):
+        # Compare equal to the wrapped callback so unsubscribe() finds it
+        return self.callback == getattr(other, "callback", other)
+
+
+class _WeakCallback:
+    """Bound-method subscriber that does not keep its object alive"""
 
-    # Analog sticks (0-255 range)
-    left_x: int = 128
-    left_y: int = 128
-    right_x: int = 128
-    right_y: int = 128
+    __slots__ = ("ref", "safe")
 
-    # Buttons (0 or 1)
-    btn_west: int = 0  # Square/X
-    btn_east: int = 0  # Circle/B
-    btn_south: int = 0  # X/A
-    btn_north: int = 0  # Triangle/Y
+    def __init__(self, method, safe, on_dead):
+        # on_dead runs once the method's object has been collected
+        self.ref = weakref.WeakMethod(method, lambda ref: on_dead())
+        self.safe = safe
+
+    def __call__(self, state: JoystickState, mask: int):
+        method = self.ref()
+        if method is None:
+            return
+        if not self.safe:
+            method(state, mask)
+            return
+        try:
+            method(state, mask)
+        except Exception as e:
+            print(f"JoystickController: Error notifying subscriber: {e}")
+
+    def __eq__(self, other):
+        # Compare equal to the live bound method so unsubscribe() finds it
+        method = self.ref()
+        return method is not None and method == getattr(other, "ref", lambda: other)()
 
 
 class JoystickController:
     def __init__(self):
-        self.running = True
-        self.state = JoystickState()
-        self.state_lock = threading.Lock()
+        self._stop = threading.Event()
+        # Single writer: the reader thread owns _mutable_state and publishes
+        # pooled copies of it to _published. Reference assignment is atomic,
+        # so no lock is needed.
+        self._mutable_state = JoystickState()
+        self._pool = [JoystickState() for _ in range(_SNAPSHOT_POOL_SIZE)]
+        self._pool_idx = 0
+        self._published = None
+        self._publish()
 
         # Subscribers for state updates
-        self.subscribers: List[Callable[[JoystickState], None]] = []
+        # Copy-on-write tuple, so the reader can iterate it without a lock
+        self.subscribers: Tuple[Callable[[JoystickState, int], None], ...] = ()
+
+        # Prefer batched reads from the event device, fall back to inputs
+        self._event_fd = self._open_event_device()
+        if self._event_fd is not None:
+            reader = self._read_event_device
+        else:
+            reader = self._read_gamepad
 
         # Start reader thread
-        self.reader_thread = threading.Thread(target=self._read_gamepad, daemon=True)
+        self.reader_thread = threading.Thread(target=reader, daemon=True)
         self.reader_thread.start()
 
         print("JoystickController: Started")
 
+    def _open_event_device(self) -> Optional[int]:
+        """Open the first gamepad's /dev/input/eventN node, if there is one"""
+        try:
+            path = devices.gamepads[0].get_char_device_path()
+            if not path.startswith("/dev/input/event"):
+                return None
+            return os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+        except (IndexError, AttributeError, OSError) as e:
+            print(f"JoystickController: Using inputs polling ({e})")
+            return None
+
+    def _read_event_device(self):
+        """Read batches of raw input events and update state"""
+        print("JoystickController: Event device reader thread started")
+        fd = self._event_fd
+        # Changes since the last SYN_REPORT, carried across reads
+        mask = 0
+        backoff = _ERROR_BACKOFF_MIN
+
+        while not self._stop.is_set():
+            try:
+                # The timeout only bounds how long cleanup() waits for us
+                readable, _, _ = select.select([fd], [], [], 0.05)
+                if not readable:
+                    continue
+                buf = os.read(fd, _EVENT_SIZE * _EVENT_BATCH)
+                backoff = _ERROR_BACKOFF_MIN
+
+                # Only publish complete packets, never a half-applied set of
+                # axis updates: apply up to the batch's last SYN_REPORT,
+                # publish once, then carry whatever follows to the next read
+                events = list(struct.iter_unpack(_EVENT_FORMAT, buf))
+                last_syn = len(events) - 1
+                while last_syn >= 0 and events[last_syn][2:4] != (EV_SYN, SYN_REPORT):
+                    last_syn -= 1
+                mask = self._apply_events(events[: last_syn + 1], mask)
+                if last_syn >= 0 and mask:
+                    state_copy, reported = self._publish(), mask
+                    mask = self._apply_events(events[last_syn + 1 :], 0)
+                    self._notify_subscribers(state_copy, reported)
+                else:
+                    mask = self._apply_events(events[last_syn + 1 :], mask)
+
+            except BlockingIOError:
+                continue
+            except Exception as e:
+                print(f"JoystickController: Event device error: {e}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, _ERROR_BACKOFF_MAX)
+
+    def _apply_events(self, events, mask: int) -> int:
+        """Apply raw input events to the live state, returning the dirty mask"""
+        state = self._mutable_state
+        for _, _, ev_type, code, value in events:
+            entry = _EVDEV_FIELDS.get((ev_type, code))
+            if entry is not None:
+                field, bit = entry
+                if getattr(state, field) != value:
+                    setattr(state, field, value)
+                    mask |= bit
+        return mask
+
     def _read_gamepad(self):
         """Read gamepad events and update state"""
         print("JoystickController: Gamepad reader thread started")
+        backoff = _ERROR_BACKOFF_MIN
 
-        while self.running:
+        while not self._stop.is_set():
             try:
                 events = get_gamepad()
-                state_changed = False
-
-                with self.state_lock:
-                    for event in events:
-                        if event.code == "ABS_X":
-                            self.state.left_x = event.state
-                            state_changed = True
-                        elif event.code == "ABS_Y":
-                            self.state.left_y = event.state
-                            state_changed = True
-                        elif event.code == "ABS_RX":
-                            self.state.right_x = event.state
-                            state_changed = True
-                        elif event.code == "ABS_RY":
-                            self.state.right_y = event.state
-                            state_changed = True
-                        elif event.code == "BTN_WEST":
-                            self.state.btn_west = event.state
-                            state_changed = True
-                        elif event.code == "BTN_EAST":
-                            self.state.btn_east = event.state
-                            state_changed = True
-                        elif event.code == "BTN_SOUTH":
-                            self.state.btn_south = event.state
-                            state_changed = True
-                        elif event.code == "BTN_NORTH":
-                            self.state.btn_north = event.state
-                            state_changed = True
+                backoff = _ERROR_BACKOFF_MIN
+                mask = 0
+
+                state = self._mutable_state
+                for event in events:
+                    entry = _INPUTS_FIELDS.get(event.code)
+                    if entry is not None:
+                        field, bit = entry
+                        if getattr(state, field) != event.state:
+                            setattr(state, field, event.state)
+                            mask |= bit
 
                 # Notify subscribers if state changed
-                if state_changed:
-                    self._notify_subscribers()
+                if mask:
+                    self._notify_subscribers(self._publish(), mask)
 
             except Exception as e:
                 print(f"JoystickController: Gamepad error: {e}")
-                time.sleep(0.1)
-
-    def _notify_subscribers(self):
-        """Notify all subscribers of state change"""
-        with self.state_lock:
-            state_copy = JoystickState(
-                left_x=self.state.left_x,
-                left_y=self.state.left_y,
-                right_x=self.state.right_x,
-                right_y=self.state.right_y,
-                btn_west=self.state.btn_west,
-                btn_east=self.state.btn_east,
-                btn_south=self.state.btn_south,
-                btn_north=self.state.btn_north,
-            )
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, _ERROR_BACKOFF_MAX)
 
-        for subscriber in self.subscribers:
-            try:
-                subscriber(state_copy)
-            except Exception as e:
-                print(f"JoystickController: Error notifying subscriber: {e}")
+    def _publish(self) -> JoystickState:
+        """Copy the live state into the next pooled snapshot and publish it"""
+        snap = self._pool[self._pool_idx]
+        self._pool_idx = (self._pool_idx + 1) & (_SNAPSHOT_POOL_SIZE - 1)
+        self._mutable_state.copy_into(snap)
+        self._published = snap
+        return snap
 
-    def subscribe(self, callback: Callable[[JoystickState], None]):
-        """Add a subscriber for joystick state updates"""
-        self.subscribers.append(callback)
+    def _notify_subscribers(self, state_copy: JoystickState, mask: int):
+        """Notify all subscribers with a published state snapshot"""
+        # Subscribers are wrapped unless they opted out with safe=False; one
+        # that raises anyway must not look like a device error to the reader
+        # loop and stall it in the error backoff
+        try:
+            for subscriber in self.subscribers:
+                subscriber(state_copy, mask)
+        except Exception as e:
+            print(f"JoystickController: Error notifying subscriber: {e}")
+
+    def subscribe(self, callback: Callable[[JoystickState, int], None], safe=True):
+        """Add a subscriber for joystick state updates
+
+        Exceptions from a subscriber are reported and do not stop the others
+        being notified. Pass safe=False to skip that wrapper for a callback
+        that handles its own errors; if it raises anyway, the subscribers
+        after it miss that update.
+        Bound methods are held weakly, so a controller that is dropped without
+        unsubscribing does not stay alive through this list.
+        """
+        if hasattr(callback, "__self__") and hasattr(callback, "__func__"):
+            callback = _WeakCallback(callback, safe, self._drop_dead_subscribers)
+        elif safe:
+            callback = _SafeCallback(callback)
+        self.subscribers = self.subscribers + (callback,)
         print(
             f"JoystickController: Added subscriber. Total subscribers: {len(self.subscribers)}"
         )
 
-    def unsubscribe(self, callback: Callable[[JoystickState], None]):
+    def unsubscribe(self, callback: Callable[[JoystickState, int], None]):
         """Remove a subscriber"""
         if callback in self.subscribers:
-            self.subscribers.remove(callback)
+            self.subscribers = tuple(s for s in self.subscribers if s != callback)
             print(
                 f"JoystickController: Removed subscriber. Total subscribers: {len(self.subscribers)}"
             )
 
+    def _drop_dead_subscribers(self):
+        """Forget subscribers whose objects have been collected"""
+        self.subscribers = tuple(
+            s
+            for s in self.subscribers
+            if not (isinstance(s, _WeakCallback) and s.ref() is None)
+        )
+
     def get_current_state(self) -> JoystickState:
         """Get current joystick state"""
-        with self.state_lock:
-            return JoystickState(
-                left_x=self.state.left_x,
-                left_y=self.state.left_y,
-                right_x=self.state.right_x,
-                right_y=self.state.right_y,
-                btn_west=self.state.btn_west,
-                btn_east=self.state.btn_east,
-                btn_south=self.state.btn_south,
-                btn_north=self.state.btn_north,
-            )
+        # Pooled snapshots get reused, so hand out a private copy
+        return self._published.copy()
 
     def cleanup(self):
         """Clean up resources"""
         print("JoystickController: Cleaning up...")
-        self.running = False
+        self._stop.set()
         if self.reader_thread:
-            self.reader_thread.join(timeout=1)
+            # The inputs fallback may still be blocked in get_gamepad(); it is
+            # a daemon thread, so don't wait on it for long
+            self.reader_thread.join(timeout=0.1)
+        if self._event_fd is not None:
+            os.close(self._event_fd)
+            self._event_fd = None
         print("JoystickController: Cleanup complete")
@@ -5,11 +5,20 @@ from datetime import datetime, timedelta
 import time
 import csv
 import tempfile  # Add this
+import io
 import os  # Add this
+import logging
+from collections import deque
 from timeline_widget import TimelineCanvas
 from audio_player import AudioPlayer
-from eye_controller import EyeController
-from mouth_controller import MouthController
+from eye_controller import (
+    BUTTON_BOTH,
+    BUTTON_LEFT,
+    BUTTON_RIGHT,
+    EyeController,
+    log as eye_log,
+)
+from mouth_controller import MouthController, log as mouth_log
 from joystick_controller import JoystickController
 from settings_dialog import SettingsDialog
 from settings import Settings
@@ -28,9 +37,70 @@ NM_SETTINGS = "Settings ..."
 NM_REC_EYE_RESET = "Reset Eye Recording"
 NM_REC_MOUTH_RESET = "Reset Mouth Recording"
 NM_REC_ALL_RESET = "Reset All Recordings"
+NM_VERBOSE = "Verbose Logging"
 NM_EXIT = "Exit"
 LBL_WINDOW = "Animatronics Studio"
 
+# Period of the GUI update loop while playing or recording, while paused
+# and when idle; nothing on the timeline moves in the last two states
+GUI_PERIOD_ACTIVE = 1 / 60
+GUI_PERIOD_PAUSED = 0.25
+GUI_PERIOD_IDLE = 1.0
+
+# A joystick sample that repeats the last recorded one is only recorded
+# again once this many ms have passed since that one
+RECORD_HOLD_MS = 200
+
+# Recent marker update costs kept to judge whether the canvas keeps up, and
+# the share of the tick period they may use before updates are thinned out
+MARKER_COST_WINDOW = 30
+MARKER_COST_BUDGET = 0.8
+
+log = logging.getLogger(__name__)
+
+
+class _RepeatFilter:
+    """Drops recorded samples that only repeat the previous one
+
+    When the sample changes after a run of dropped repeats, the last repeat
+    is recorded first, so playback holds the old value until the change
+    instead of interpolating across the whole gap.
+    """
+
+    __slots__ = ("last", "last_time", "held_time")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.last = None
+        self.last_time = 0
+        self.held_time = None  # Time of the last dropped repeat
+
+    def frames(self, time_ms, sample):
+        """(time_ms, sample) pairs to record for sample taken at time_ms"""
+        if sample == self.last:
+            if time_ms - self.last_time < RECORD_HOLD_MS:
+                self.held_time = time_ms
+                return ()
+            frames = ((time_ms, sample),)
+        elif self.held_time is not None:
+            frames = ((self.held_time, self.last), (time_ms, sample))
+        else:
+            frames = ((time_ms, sample),)
+        self.last = sample
+        self.last_time = time_ms
+        self.held_time = None
+        return frames
+
+    def flush(self):
+        """The dropped repeat still owed at the end of a recording, if any"""
+        if self.held_time is None:
+            return ()
+        frames = ((self.held_time, self.last),)
+        self.reset()
+        return frames
+
 
 class AnimationControlGUI:
     def __init__(self, root):
@@ -38,9 +108,19 @@ class AnimationControlGUI:
         self.root.title(LBL_WINDOW)
 
         # Initialize controllers and settings
-        pygame.init()
         self.settings = Settings()
+        # A larger mixer buffer trades a few ms of latency for fewer underruns
+        pygame.mixer.pre_init(
+            frequency=44100,
+            size=-16,
+            channels=2,
+            buffer=self.settings.get_setting("audio_buffer_samples"),
+        )
+        # Only the mixer is used: Tk draws the UI and the gamepad is read
+        # through evdev, so skip pygame.init() and its display/joystick setup
+        pygame.mixer.init()
         self.audio_player = AudioPlayer()
+        self._audio_duration = 0  # Cached at load time for update_gui
 
         # Initialize centralized joystick controller
         self.joystick_controller = JoystickController()
@@ -63,8 +143,37 @@ class AnimationControlGUI:
         self.is_playing = False
         self.is_paused = False
         self.elapsed_time = 0
+        self.current_time = 0
+        self._visible = True  # False while the window is iconified
+        self._marker_costs = deque(maxlen=MARKER_COST_WINDOW)  # Seconds each
+        self._marker_skip = False  # Skip the next marker update, see _move_marker
+        self._t0 = 0  # monotonic_ns() at playback start when there is no audio
+        # Configured log level; DEBUG turns on per-frame diagnostics
+        self._log_level = logging.getLevelName(self.settings.get_setting("log_level"))
+        if not isinstance(self._log_level, int):
+            self._log_level = logging.INFO
+        self._verbose = self._log_level <= logging.DEBUG  # See toggle_verbose()
+        self._next_tick = time.monotonic()  # Deadline of the next update_gui
+        self._after_id = None  # Pending update_gui callback, None while in it
+        self._tick_period = GUI_PERIOD_IDLE
+        # Tracks update_gui records or plays, fixed in play_or_record()
+        self._active_target = None
+        self._record_eye = False
+        self._record_mouth = False
+        self._play_eye = False
+        self._play_mouth = False
+        self._menu_dirty = True  # Menu states may be stale, see update_menu_states
+        self._menu_states = {}  # Menu entry label -> last enabled state pushed
+        self._eye_filter = _RepeatFilter()
+        self._mouth_filter = _RepeatFilter()
+        self._select_tick()
 
         self.setup_gui()
+        self.toggle_verbose()
+
+        # Track window visibility from events so ticks never have to ask Tk
+        self.root.bind("<Map>", self._on_map, add="+")
+        self.root.bind("<Unmap>", self._on_unmap, add="+")
 
     def setup_gui(self):
         """Set up the GUI with stable layout"""
@@ -159,6 +268,11 @@ class AnimationControlGUI:
             command=self.clear_all_tracks,
             state="disabled",
         )
+        self.edit_menu.add_separator()
+        self.verbose_var = tk.BooleanVar(value=self._verbose)
+        self.edit_menu.add_checkbutton(
+            label=NM_VERBOSE, variable=self.verbose_var, command=self.toggle_verbose
+        )
 
     def create_audio_controls(self, parent):
         audio_frame = ttk.LabelFrame(parent, text="Audio Controls", padding="5")
@@ -209,23 +323,25 @@ class AnimationControlGUI:
         self.mouth_radio.grid(row=0, column=2, padx=5)
 
         # Playback/Record controls
-        control_frame = ttk.Frame(control_frame)
-        control_frame.grid(row=1, column=0, columnspan=2, pady=5)
+        transport_row = ttk.Frame(control_frame)
+        transport_row.grid(row=1, column=0, columnspan=2, pady=5)
 
         self.play_record_button = ttk.Button(
-            control_frame, text="▶", command=self.play_or_record
+            transport_row, text="▶", command=self.play_or_record
         )
         self.play_record_button.grid(row=0, column=0, padx=2)
 
         self.pause_button = ttk.Button(
-            control_frame, text="⏸", command=self.pause, state="disabled"
+            transport_row, text="⏸", command=self.pause, state="disabled"
         )
         self.pause_button.grid(row=0, column=1, padx=2)
 
         self.stop_button = ttk.Button(
-            control_frame, text="⏹", command=self.stop, state="disabled"
+            transport_row, text="⏹", command=self.stop, state="disabled"
         )
         self.stop_button.grid(row=0, column=2, padx=2)
+        # (play/record, pause, stop) states last applied to the buttons
+        self._button_states = ("normal", "disabled", "disabled")
 
     def update_record_controls(self):
         """Update controls based on record on playback setting"""
@@ -251,6 +367,8 @@ class AnimationControlGUI:
         self.timeline.clear_eye_data()
         self.timeline.clear_mouth_data()
         self.audio_player.unload()
+        self._audio_duration = 0
+        self._select_tick()  # The clock source may have changed
         self.audio_label.config(text="No audio loaded")
         self.timeline.clear_audio_data()
         self.update_menu_states()
@@ -319,7 +437,8 @@ class AnimationControlGUI:
 
         try:
             # Load the bundle
-            bundle = FileFormat.load_bundle(filename)
+            # Frames are streamed into the timeline below, not listed here
+            bundle = FileFormat.load_bundle(filename, frames=False)
             if not bundle:
                 raise ValueError("Failed to load animation bundle")
 
@@ -327,56 +446,48 @@ class AnimationControlGUI:
             self.timeline.clear_eye_data()
             self.timeline.clear_mouth_data()
             self.audio_player.unload()
+            self._audio_duration = 0
+            self._select_tick()  # The clock source may have changed
 
-            # If bundle has audio, save it to temp file and load it
+            # If bundle has audio, load it. WAV plays straight from memory,
+            # other formats go through a temp file since some mixer backends
+            # can only decode them from a path
             if bundle.audio_data:
                 audio_ext = bundle.metadata.get("audio_format", "wav")
-                with tempfile.NamedTemporaryFile(
-                    suffix=f".{audio_ext}", delete=False
-                ) as temp_file:
-                    temp_file.write(bundle.audio_data)
-                    temp_path = temp_file.name
-
-                if self.audio_player.load_file(temp_path):
-                    self.audio_label.config(text=bundle.audio_file or "Bundled audio")
-                    duration_ms = self.audio_player.get_duration()
-                    self.timeline.set_audio_duration(duration_ms)
-                    self.timeline.load_audio_file(temp_path)
-
-                # Clean up temp file
-                try:
-                    os.remove(temp_path)
-                except Exception as e:
-                    print(f"Warning: Could not remove temporary audio file: {e}")
+                if audio_ext == "wav":
+                    if self.audio_player.load_bytes(bundle.audio_data, audio_ext):
+                        self._show_bundle_audio(
+                            bundle, io.BytesIO(bundle.audio_data), audio_ext
+                        )
+                else:
+                    with tempfile.NamedTemporaryFile(
+                        suffix=f".{audio_ext}", delete=False
+                    ) as temp_file:
+                        temp_file.write(bundle.audio_data)
+                        temp_path = temp_file.name
+
+                    if self.audio_player.load_file(temp_path):
+                        self._show_bundle_audio(bundle, temp_path)
+
+                    # Clean up temp file
+                    try:
+                        os.remove(temp_path)
+                    except Exception as e:
+                        print(
+                            f"Warning: Could not remove temporary audio file: {e}"
+                        )
 
             # Load animation data
-            for frame in bundle.eye_frames:
-                self.timeline.add_eye_data_point(
-                    frame.time_ms,
-                    frame.x,
-                    frame.y,
-                    frame.left_closed,
-                    frame.right_closed,
-                    frame.both_closed,
-                )
-
-            for frame in bundle.mouth_frames:
-                self.timeline.add_mouth_data_point(frame.time_ms, frame.position)
+            self.timeline.stream_load_data(FileFormat.iter_bundle(filename))
+            max_time = self.timeline.max_time_ms
 
             # Update UI
+            self.timeline.flush_points()
             self.timeline.update_time_marker(0)
             self.update_menu_states()
 
             # Update status
-            total_frames = len(bundle.eye_frames) + len(bundle.mouth_frames)
-            max_time = max(
-                (
-                    [frame.time_ms for frame in bundle.eye_frames]
-                    + [frame.time_ms for frame in bundle.mouth_frames]
-                ),
-                default=0,
-            )
-
+            total_frames = len(self.timeline.eye_data) + len(self.timeline.mouth_data)
             self.status_var.set(
                 f"Loaded {total_frames} frames ({max_time/1000:.1f} seconds) from bundle"
             )
@@ -385,15 +496,26 @@ class AnimationControlGUI:
             messagebox.showerror("Error", f"Failed to load bundle: {str(e)}")
             print(f"Error details: {e}")
 
+    def _show_bundle_audio(self, bundle, source, audio_format=None):
+        """Update the editor for audio just loaded from a bundle"""
+        self.audio_label.config(text=bundle.audio_file or "Bundled audio")
+        duration_ms = self.audio_player.get_duration()
+        self._audio_duration = duration_ms
+        self._select_tick()  # The clock source may have changed
+        self.timeline.set_audio_duration(duration_ms)
+        self.timeline.load_audio_file(source, audio_format)
+
     def load_audio(self):
         file_path = filedialog.askopenfilename(
             filetypes=[("Audio files", "*.wav *.mp3"), ("All files", "*.*")]
         )
         if file_path:
             if self.audio_player.load_file(file_path):
-                self.audio_label.config(text=file_path.split("/")[-1])
+                self.audio_label.config(text=os.path.basename(file_path))
                 # Set audio duration for timeline
                 duration_ms = self.audio_player.get_duration()
+                self._audio_duration = duration_ms
+                self._select_tick()  # The clock source may have changed
                 self.timeline.set_audio_duration(duration_ms)
                 # Load audio data for visualization
                 self.timeline.load_audio_file(file_path)
@@ -407,31 +529,37 @@ class AnimationControlGUI:
             # Record mode
             target = self.record_target_var.get()
             if target == "eyes":
-                print("Starting new eye recording")
+                log.info("Starting new eye recording")
                 self.timeline.clear_eye_data()
             elif target == "mouth":
-                print("Starting new mouth recording")
+                log.info("Starting new mouth recording")
                 self.timeline.clear_mouth_data()
             elif target == "both":
-                print("Starting new recording for both eyes and mouth")
+                log.info("Starting new recording for both eyes and mouth")
                 self.timeline.clear_eye_data()
                 self.timeline.clear_mouth_data()
 
             self.is_playing = True
             self.is_recording = True
+            self._active_target = target
+            self._record_eye = target in ("eyes", "both")
+            self._record_mouth = target in ("mouth", "both")
+            self._menu_dirty = True  # The target tracks were just cleared
+            self._eye_filter.reset()
+            self._mouth_filter.reset()
 
             # Start audio playback if loaded
             if self.audio_player.is_loaded():
                 self.audio_player.play()
             else:
                 # No audio, set recording start time
-                self.recording_start_time = time.time()
+                self._t0 = time.monotonic_ns()
 
             # Enable joystick control for the selected target
-            self.eye_controller.joystick_enabled = target in ["eyes", "both"]
-            self.mouth_controller.joystick_enabled = target in ["mouth", "both"]
+            self.eye_controller.joystick_enabled = self._record_eye
+            self.mouth_controller.joystick_enabled = self._record_mouth
 
-            print("Recording started")
+            log.info("Recording started")
             self.status_var.set(f"Recording {target}")
         else:
             # Playback mode
@@ -443,8 +571,8 @@ class AnimationControlGUI:
                 if self.audio_player.is_loaded():
                     self.audio_player.unpause()
                 else:
-                    # Adjust recording_start_time to account for elapsed_time
-                    self.recording_start_time = time.time() - (self.elapsed_time / 1000)
+                    # Shift the start time to account for elapsed_time
+                    self._t0 = time.monotonic_ns() - int(self.elapsed_time * 1_000_000)
 
                 self.status_var.set("Resuming playback")
             else:
@@ -452,8 +580,10 @@ class AnimationControlGUI:
                 has_recording = (
                     len(self.timeline.eye_data) > 0 or len(self.timeline.mouth_data) > 0
                 )
-                print(
-                    f"Attempting playback with {len(self.timeline.eye_data)} eye frames and {len(self.timeline.mouth_data)} mouth frames"
+                log.info(
+                    "Attempting playback with %d eye frames and %d mouth frames",
+                    len(self.timeline.eye_data),
+                    len(self.timeline.mouth_data),
                 )
 
                 if not has_recording and not self.audio_player.is_loaded():
@@ -469,66 +599,74 @@ class AnimationControlGUI:
                 # Disable joystick during playback
                 self.eye_controller.joystick_enabled = False
                 self.mouth_controller.joystick_enabled = False
-                print("Disabled joystick for playback")
+                log.debug("Disabled joystick for playback")
 
                 if self.audio_player.is_loaded():
                     self.audio_player.play()
                 else:
                     # No audio, set recording start time
-                    self.recording_start_time = time.time()
+                    self._t0 = time.monotonic_ns()
 
                 self.status_var.set("Playing back recording")
 
+        self._play_eye = len(self.timeline.eye_data) > 0
+        self._play_mouth = len(self.timeline.mouth_data) > 0
+        self._select_tick()
         self.update_button_states()
 
     def update_menu_states(self):
         """Update the state of menu items based on recording presence"""
+        self._menu_dirty = False
         has_eye_recording = len(self.timeline.eye_data) > 0
         has_mouth_recording = len(self.timeline.mouth_data) > 0
         has_any_recording = has_eye_recording or has_mouth_recording
 
-        # Update eye recording reset button
-        self.edit_menu.entryconfig(
-            NM_REC_EYE_RESET, state="normal" if has_eye_recording else "disabled"
+        entries = (
+            # Reset buttons
+            (self.edit_menu, NM_REC_EYE_RESET, has_eye_recording),
+            (self.edit_menu, NM_REC_MOUTH_RESET, has_mouth_recording),
+            (self.edit_menu, NM_REC_ALL_RESET, has_any_recording),
+            # Save buttons
+            (self.file_menu, NM_BUNDLE_SAVE, has_any_recording),
+            (self.file_menu, NM_REC_SAVE, has_any_recording),
         )
 
-        # Update mouth recording reset button
-        self.edit_menu.entryconfig(
-            NM_REC_MOUTH_RESET,
-            state="normal" if has_mouth_recording else "disabled",
-        )
-
-        # Update reset all button
-        self.edit_menu.entryconfig(
-            NM_REC_ALL_RESET,
-            state="normal" if has_any_recording else "disabled",
-        )
-
-        # Update save buttons
-        self.file_menu.entryconfig(
-            NM_BUNDLE_SAVE,
-            state="normal" if has_any_recording else "disabled",
-        )
-        self.file_menu.entryconfig(
-            NM_REC_SAVE,
-            state="normal" if has_any_recording else "disabled",
-        )
-
-        print(f"Menu states updated - Has recordings: {has_any_recording}")
+        # Each entryconfig is a Tcl round trip, so only push actual changes
+        menu_states = self._menu_states
+        for menu, label, enabled in entries:
+            if menu_states.get(label) != enabled:
+                menu_states[label] = enabled
+                menu.entryconfig(label, state="normal" if enabled else "disabled")
+
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Menu states updated - Has recordings: %s", has_any_recording)
+
+    def toggle_verbose(self):
+        """Switch per-frame diagnostic output on or off"""
+        self._verbose = self.verbose_var.get()
+        level = logging.DEBUG if self._verbose else max(self._log_level, logging.INFO)
+        log.setLevel(level)
+        eye_log.setLevel(level)
+        mouth_log.setLevel(level)
+        self.timeline.verbose = self._verbose
 
     def update_button_states(self):
         """Update button states based on current playback/recording state"""
         if self.is_playing:
-            self.play_record_button.config(state="disabled")
-            self.pause_button.config(state="normal")
-            self.stop_button.config(state="normal")
+            states = ("disabled", "normal", "normal")
+        elif self.is_paused:
+            states = ("normal", "disabled", "normal")
         else:
-            self.play_record_button.config(state="normal")
-            self.pause_button.config(state="disabled")
-            if self.is_paused:
-                self.stop_button.config(state="normal")
-            else:
-                self.stop_button.config(state="disabled")
+            states = ("normal", "disabled", "disabled")
+
+        # Reconfiguring a widget invalidates it even when nothing changes
+        if states == self._button_states:
+            return
+        self._button_states = states
+        play_record, pause, stop = states
+        self.play_record_button.config(state=play_record)
+        self.pause_button.config(state=pause)
+        self.stop_button.config(state=stop)
 
     def pause(self):
         if self.audio_player.is_loaded():
@@ -536,140 +674,279 @@ class AnimationControlGUI:
         self.is_playing = False
         self.is_paused = True
         self.elapsed_time = self.current_time
+        self.timeline.flush_points()
+        self._select_tick()
         self.status_var.set("Paused")
         self.update_button_states()
 
     def stop(self):
-        print("Stopping playback")
+        log.info("Stopping playback")
         if self.audio_player.is_loaded():
             self.audio_player.stop()
         self.is_playing = False
 
         if self.is_recording:
+            # Record the held samples still owed to the tracks
+            if self._record_eye:
+                self._add_eye_frames(self._eye_filter.flush())
+            if self._record_mouth:
+                self._add_mouth_frames(self._mouth_filter.flush())
             self.record_on_play_var.set(False)  # Turn off the recording mode
             self.update_record_controls()  # Update controls
 
         self.is_recording = False
         self.is_paused = False
+        self._active_target = None
+        self._record_eye = self._record_mouth = False
         self.elapsed_time = 0
         self.current_time = 0  # Reset current_time
         # Re-enable joystick when stopping
         self.eye_controller.joystick_enabled = True
         self.mouth_controller.joystick_enabled = True  # Add this line
+        self.timeline.flush_points()
         self.timeline.update_time_marker(0)
+        self._select_tick()
         self.status_var.set("Stopped")
         self.update_button_states()
         self.update_menu_states()
 
-    def update_gui(self):
-        """Update GUI state and timeline"""
+    def _select_tick(self):
+        """Pick the update_gui step and period for the current state"""
+        period = self._tick_period
         if self.is_playing:
-            if self.audio_player.is_loaded():
-                # Get current time from audio player
-                self.current_time = self.audio_player.get_position()
-                # Check if audio has finished playing
-                if (
-                    not self.audio_player.is_playing()
-                    or self.current_time >= self.audio_player.get_duration()
-                ):
-                    print("Audio playback finished")
-                    self.stop()
-                    self.update_button_states()  # Make sure buttons update
+            audio = self.audio_player.is_loaded()
+            if self.is_recording:
+                tick = self._tick_recording_audio if audio else self._tick_recording
             else:
-                # If no audio is loaded, use time elapsed since playback started
-                current_time_ms = (time.time() - self.recording_start_time) * 1000
-                self.current_time = int(current_time_ms)
-
-                # Check if we've reached the end of our recorded data
-                max_time = 0
-                if self.timeline.eye_data:
-                    max_time = max(max_time, self.timeline.eye_data[-1][0])
-                if self.timeline.mouth_data:
-                    max_time = max(max_time, self.timeline.mouth_data[-1][0])
-
-                # Add a small buffer to max_time to ensure we catch the end
-                if max_time > 0 and self.current_time >= (
-                    max_time + 100
-                ):  # 100ms buffer
-                    print("Reached end of recorded data")
-                    self.stop()
-                    self.update_button_states()  # Make sure buttons update
-
+                tick = self._tick_playing_audio if audio else self._tick_playing
+            self._tick_fn = tick
+            self._tick_period = GUI_PERIOD_ACTIVE
         elif self.is_paused:
-            # Keep current_time as is during pause
-            pass
+            self._tick_fn = self._tick_paused
+            self._tick_period = GUI_PERIOD_PAUSED
         else:
-            self.current_time = 0
+            self._tick_fn = self._tick_idle
+            self._tick_period = GUI_PERIOD_IDLE
+
+        # Entering a faster state must not wait out the slow idle period, or
+        # the start of a recording would be lost
+        if self._tick_period < period and self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._next_tick = time.monotonic()
+            self._after_id = self.root.after_idle(self.update_gui)
+
+    def _advance_audio_clock(self):
+        """Follow the audio position, returns False once the audio has ended"""
+        self.current_time = self.audio_player.get_position()
+        # Audio has finished once its clock reaches the end; this is plain
+        # arithmetic, no need to poll the mixer every frame
+        if self.current_time >= self._audio_duration:
+            log.info("Audio playback finished")
+            self.stop()
+            return False
+        return True
+
+    def _advance_clock(self):
+        """Follow the time since playback started, False past the last frame"""
+        self.current_time = (time.monotonic_ns() - self._t0) // 1_000_000
+        # Add a small buffer to the last frame to ensure we catch the end
+        max_time = self.timeline.max_time_ms
+        if max_time > 0 and self.current_time >= max_time + 100:
+            log.info("Reached end of recorded data")
+            self.stop()
+            return False
+        return True
+
+    def _record_frame(self):
+        """Move the marker and record the targets picked in play_or_record"""
+        self._move_marker()
+        if self._record_eye:
+            if self._record_mouth:
+                self.record_both_data()
+            else:
+                self.record_eye_data()
+        elif self._record_mouth:
+            self.record_mouth_data()
+
+    def _tick_recording_audio(self):
+        if self._advance_audio_clock():
+            self._record_frame()
+
+    def _tick_recording(self):
+        # No end check: the recording is what defines the end
+        self.current_time = (time.monotonic_ns() - self._t0) // 1_000_000
+        self._record_frame()
+
+    def _tick_playing_audio(self):
+        if self._advance_audio_clock():
+            self._move_marker()
+            self.playback_movements()
+
+    def _tick_playing(self):
+        if self._advance_clock():
+            self._move_marker()
+            self.playback_movements()
+
+    def _tick_paused(self):
+        # Keep current_time as is during pause
+        self._move_marker()
+
+    def _tick_idle(self):
+        self.current_time = 0
+        self._move_marker()
+
+    def _move_marker(self):
+        """Follow current_time with the marker, unless nobody can see it
+
+        When the slowest tenth of recent updates takes more than the frame
+        budget, every other update is skipped until the canvas catches up.
+        """
+        if not self._visible:
+            return
+        if self._marker_skip:
+            self._marker_skip = False
+            return
 
-        # Always update timeline marker
-        self.timeline.update_time_marker(self.current_time)
+        start = time.perf_counter()
+        self.timeline.move_time_marker(self.current_time)
+        costs = self._marker_costs
+        costs.append(time.perf_counter() - start)
 
-        # Handle playback/recording states
-        if self.is_playing:
-            if self.is_recording:
-                target = self.record_target_var.get()
-                if target == "eyes":
-                    self.record_eye_data()
-                elif target == "mouth":
-                    self.record_mouth_data()
-                elif target == "both":
-                    self.record_eye_data()
-                    self.record_mouth_data()
-            else:
-                self.playback_movements()
+        if len(costs) == MARKER_COST_WINDOW:
+            p90 = sorted(costs)[MARKER_COST_WINDOW * 9 // 10]
+            self._marker_skip = p90 > self._tick_period * MARKER_COST_BUDGET
+
+    def _on_map(self, event):
+        if event.widget is self.root:
+            self._visible = True
+            self._move_marker()  # Catch up with time spent iconified
+
+    def _on_unmap(self, event):
+        if event.widget is self.root:
+            self._visible = False
+
+    def update_gui(self):
+        """Update GUI state and timeline"""
+        self._after_id = None  # This callback has fired
+        # The step for the current state, see _select_tick
+        self._tick_fn()
+
+        # Schedule the next update against a fixed deadline so the cadence
+        # does not drift with the time spent in this method. Run at ~60fps
+        # while playing or recording, and far slower when paused or idle.
+        # After a stall, start over from now instead of firing a burst of
+        # catch-up ticks.
+        now = time.monotonic()
+        self._next_tick = max(self._next_tick + self._tick_period, now)
+        self._after_id = self.root.after(
+            int((self._next_tick - now) * 1000), self.update_gui
+        )
 
-        # Schedule the next update (~60fps)
-        self.root.after(16, self.update_gui)
+    def _add_eye_frames(self, frames):
+        for time_ms, (x, y, bits) in frames:
+            self.timeline.add_eye_data_point(
+                time_ms,
+                x,
+                y,
+                bits & BUTTON_LEFT,
+                bits & BUTTON_RIGHT,
+                bits & BUTTON_BOTH,
+            )
+
+    def _add_mouth_frames(self, frames):
+        for time_ms, position in frames:
+            self.timeline.add_mouth_data_point(time_ms, position)
 
     def record_eye_data(self):
         """Record eye movement data"""
-        print(
-            f"Recording eye frame at {self.current_time}ms:",
-            f"X: {self.eye_controller.current_eye_x:.3f}",
-            f"Y: {self.eye_controller.current_eye_y:.3f}",
-        )
-        self.timeline.add_eye_data_point(
-            self.current_time,
-            self.eye_controller.current_eye_x,
-            self.eye_controller.current_eye_y,
-            self.eye_controller.prev_button_states["BTN_WEST"] == 1,
-            self.eye_controller.prev_button_states["BTN_EAST"] == 1,
-            self.eye_controller.prev_button_states["BTN_SOUTH"] == 1,
-        )
-        self.update_menu_states()  # Update menu states when recording
+        # One consistent (x, y, bits) frame published by the joystick thread
+        sample = self.eye_controller.sample
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(
+                "Recording eye frame at %sms: X: %.3f Y: %.3f",
+                self.current_time,
+                sample[0],
+                sample[1],
+            )
+        frames = self._eye_filter.frames(self.current_time, sample)
+        if frames:
+            self._add_eye_frames(frames)
+            if self._menu_dirty:  # Only the first frame can change them
+                self.update_menu_states()
 
     def record_mouth_data(self):
         """Record mouth movement data"""
-        print(
-            f"Recording mouth frame at {self.current_time}ms:",
-            f"Position: {self.mouth_controller.current_mouth_position}",
-        )
-        self.timeline.add_mouth_data_point(
-            self.current_time,
-            self.mouth_controller.current_mouth_position,
-        )
-        print(f"Added mouth data point at {self.current_time}ms")
-        self.update_menu_states()  # Update menu states when recording
+        position = self.mouth_controller.current_mouth_position
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(
+                "Recording mouth frame at %sms: Position: %s",
+                self.current_time,
+                position,
+            )
+        frames = self._mouth_filter.frames(self.current_time, position)
+        if frames:
+            self._add_mouth_frames(frames)
+            if self._menu_dirty:  # Only the first frame can change them
+                self.update_menu_states()
+
+    def record_both_data(self):
+        """Record eye and mouth data from a single read of both controllers"""
+        current_time = self.current_time
+        sample = self.eye_controller.sample
+        position = self.mouth_controller.current_mouth_position
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(
+                "Recording frame at %sms: X: %.3f Y: %.3f Mouth: %s",
+                current_time,
+                sample[0],
+                sample[1],
+                position,
+            )
+        eye_frames = self._eye_filter.frames(current_time, sample)
+        mouth_frames = self._mouth_filter.frames(current_time, position)
+        if len(eye_frames) == 1 and len(mouth_frames) == 1:
+            # Both changed on this tick alone, the common case while moving
+            x, y, bits = sample
+            self.timeline.add_both_data_point(
+                current_time,
+                x,
+                y,
+                bits & BUTTON_LEFT,
+                bits & BUTTON_RIGHT,
+                bits & BUTTON_BOTH,
+                position,
+            )
+        else:
+            self._add_eye_frames(eye_frames)
+            self._add_mouth_frames(mouth_frames)
+        if self._menu_dirty and (eye_frames or mouth_frames):
+            self.update_menu_states()  # Only the first frame can change them
 
     def playback_movements(self):
         """Playback recorded movements"""
-        if len(self.timeline.eye_data) > 0:
-            print(f"Playback: Applying eye movements at {self.current_time}ms")
+        if self._play_eye:
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("Playback: Applying eye movements at %sms", self.current_time)
             self.apply_recorded_movements(self.current_time)
-        if len(self.timeline.mouth_data) > 0:
-            print(f"Playback: Applying mouth movements at {self.current_time}ms")
+        if self._play_mouth:
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug(
+                    "Playback: Applying mouth movements at %sms", self.current_time
+                )
             self.apply_recorded_mouth_movements(self.current_time)
 
     def apply_recorded_movements(self, current_time):
         """Apply recorded eye movements during playback"""
         self.eye_controller.apply_recorded_movement(
-            current_time, self.timeline.eye_data
+            current_time, self.timeline.eye_data.times, self.timeline.eye_data.values
         )
 
     def apply_recorded_mouth_movements(self, current_time):
         """Apply recorded mouth movements during playback"""
         self.mouth_controller.apply_recorded_movement(
-            current_time, self.timeline.mouth_data
+            current_time,
+            self.timeline.mouth_data.times,
+            self.timeline.mouth_data.values,
         )
 
     def clear_eye_track(self):
@@ -736,9 +1013,6 @@ class AnimationControlGUI:
             return
 
         try:
-            # Temporarily disable UI updates
-            self.root.update_idletasks()
-
             # Clear existing recordings
             self.timeline.clear_eye_data()
             self.timeline.clear_mouth_data()
@@ -747,27 +1021,16 @@ class AnimationControlGUI:
             eye_frames, mouth_frames = FileFormat.load_from_csv(filename)
 
             # Convert to timeline format
-            for frame in eye_frames:
-                self.timeline.add_eye_data_point(
-                    frame.time_ms,
-                    frame.x,
-                    frame.y,
-                    frame.left_closed,
-                    frame.right_closed,
-                    frame.both_closed,
-                )
-
-            for frame in mouth_frames:
-                self.timeline.add_mouth_data_point(frame.time_ms, frame.position)
+            self.timeline.bulk_load_eye_data(eye_frames)
+            self.timeline.bulk_load_mouth_data(mouth_frames)
+            max_time = self.timeline.max_time_ms
 
             # Set timeline duration if needed
-            max_time = max(
-                (frame.time_ms for frame in eye_frames + mouth_frames), default=0
-            )
             if max_time > self.timeline.duration_ms:
                 self.timeline.set_audio_duration(max_time)
 
             # Force timeline to update its view
+            self.timeline.flush_points()
             self.timeline.update_time_marker(0)  # This will trigger a redraw
 
             # Update menu states
@@ -779,9 +1042,6 @@ class AnimationControlGUI:
                 f"Loaded {total_frames} frames ({max_time/1000:.1f} seconds) from {filename}"
             )
 
-            # Re-enable UI updates
-            self.root.update()
-
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load recording: {str(e)}")
             print(f"Error details: {e}")
@@ -840,6 +1100,7 @@ class AnimationControlGUI:
 
 
 def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     root = tk.Tk()
     app = AnimationControlGUI(root)
     root.protocol("WM_DELETE_WINDOW", app.on_exit)
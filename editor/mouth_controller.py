@@ -1,9 +1,33 @@
+import logging
+import numpy as np
 import socket
 import time
 import threading
-import struct
-from typing import Optional
-from queue import Queue
+from animation_protocol import MOUTH_PACKETS
+from joystick_controller import DIRTY_RIGHT_Y
+
+# Stick updates closer together than this are coalesced: only the newest
+# position is sent, once the interval since the previous packet is up
+COALESCE_MAX_AGE_NS = 10_000_000
+
+
+def _mouth_position(ry):
+    """Map a 0-255 stick reading to a mouth position, with a small deadzone"""
+    # Map from 0-255 to -1 to 1
+    ry = (ry - 128) / 128.0
+
+    # Add deadzone
+    ry = ry if abs(ry) > 0.05 else 0
+
+    # Map to 0-255 range for mouth position
+    return int(((ry + 1) / 2) * 255)
+
+
+# _mouth_position() for every in-range stick reading
+_MOUTH_POSITIONS = bytes(_mouth_position(ry) for ry in range(256))
+
+# Per-frame diagnostics go to debug; the editor's verbose toggle sets the level
+log = logging.getLogger(__name__)
 
 
 class MouthController:
@@ -12,10 +36,38 @@ class MouthController:
         self.UDP_IP = ip
         self.UDP_PORT = port
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        # Never let a full send buffer stall the joystick/playback path
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20)
+        self.sock.setblocking(False)
+        # Ask for low-delay handling (IPTOS_LOWDELAY), where the OS allows it
+        try:
+            self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_TOS, 0x10)
+        except (AttributeError, OSError):
+            pass
+        # Connect once so each update is a plain send(): the kernel keeps the
+        # resolved destination instead of parsing it on every packet
+        try:
+            self.sock.connect((ip, port))
+        except OSError as e:
+            print(f"MouthController: Error connecting socket: {e}")
 
         # State variables
         self.current_mouth_position = 128  # Initial mouth position (0-255)
         self.joystick_enabled = True
+        self._frame_idx = -1  # Playback frame used last, see apply_recorded_movement
+
+        # Stick coalescing: the joystick thread sends straight away when the
+        # last packet is old enough, otherwise it parks the position here
+        # for the flusher thread to send when the interval is up
+        self._send_lock = threading.Lock()
+        self._last_send_ns = 0
+        self._pending_position = None
+        self._pending = threading.Event()
+        self._stop = threading.Event()
+        self._flusher_thread = threading.Thread(
+            target=self._flush_pending, daemon=True
+        )
+        self._flusher_thread.start()
 
         # Subscribe to joystick
         self.joystick_controller = joystick_controller
@@ -23,67 +75,125 @@ class MouthController:
 
         print("MouthController: Initialized")
 
-    def _handle_joystick_update(self, state):
+    def _handle_joystick_update(self, state, mask):
         """Handle joystick state updates"""
         try:
-            if self.joystick_enabled:
+            # Only the right stick's vertical axis drives the mouth
+            if self.joystick_enabled and mask & DIRTY_RIGHT_Y:
                 # Use right stick vertical axis for mouth control
                 ry = state.right_y
-
-                # Map from 0-255 to -1 to 1
-                ry = (ry - 128) / 128.0
-
-                # Add deadzone
-                ry = ry if abs(ry) > 0.05 else 0
-
-                # Map to 0-255 range for mouth position
-                # Note: Changed to store actual position value
-                mouth_position = int(((ry + 1) / 2) * 255)
+                if 0 <= ry <= 255:
+                    mouth_position = _MOUTH_POSITIONS[ry]
+                else:
+                    mouth_position = _mouth_position(ry)
 
                 # Send mouth position if changed significantly
                 if abs(mouth_position - self.current_mouth_position) > 2:
                     self.current_mouth_position = mouth_position
-                    self.send_message(f"mouth,{mouth_position}")
+                    self._coalesce_position(mouth_position)
 
         except Exception as e:
             print(f"MouthController: Error handling joystick update: {e}")
 
+    def _coalesce_position(self, position):
+        """Send a stick position now, or leave it for the flusher thread"""
+        with self._send_lock:
+            now = time.monotonic_ns()
+            if self._pending_position is None and (
+                now - self._last_send_ns >= COALESCE_MAX_AGE_NS
+            ):
+                self._last_send_ns = now
+            else:
+                # Supersedes whatever is still waiting
+                self._pending_position = position
+                self._pending.set()
+                return
+        self.send_mouth_position(position)
+
+    def _flush_pending(self):
+        """Send the newest parked stick position once its interval is up"""
+        while self._pending.wait() and not self._stop.is_set():
+            with self._send_lock:
+                delay = self._last_send_ns + COALESCE_MAX_AGE_NS - time.monotonic_ns()
+            if delay > 0 and self._stop.wait(delay / 1e9):
+                break
+            with self._send_lock:
+                position = self._pending_position
+                self._pending_position = None
+                self._pending.clear()
+                self._last_send_ns = time.monotonic_ns()
+            if position is not None:
+                self.send_mouth_position(position)
+
     def encode_message(self, command):
         """Encode command messages for UDP transmission"""
         if command.startswith("mouth"):
             _, position = command.split(",")
-            pos_byte = int(position)  # Should be 0-255
-            return b"\x50" + struct.pack("B", pos_byte)
+            return MOUTH_PACKETS[int(position)]  # Should be 0-255
         else:
             raise ValueError(f"MouthController: Unknown command: {command}")
 
     def send_message(self, message: str):
         """Send UDP message"""
         try:
-            encoded_message = self.encode_message(message)
-            self.sock.sendto(encoded_message, (self.UDP_IP, self.UDP_PORT))
-            print(f"MouthController: Sent {message}")
+            self._send_packet(self.encode_message(message))
         except Exception as e:
             print(f"MouthController: Error sending message: {e}")
 
-    def apply_recorded_movement(self, current_time, mouth_data):
-        """Apply recorded mouth movements during playback"""
-        if not self.joystick_enabled:  # Only apply during playback
-            frame_to_play = None
-            for frame in mouth_data:
-                if frame[0] <= current_time:
-                    frame_to_play = frame
-                else:
-                    break
+    def send_mouth_position(self, position: int):
+        """Send a 0-255 mouth position, without going through a command string"""
+        self._send_packet(MOUTH_PACKETS[position])
+
+    def _send_packet(self, packet: bytes):
+        """Send an encoded packet"""
+        try:
+            self.sock.send(packet)
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("MouthController: Sent %r", packet)
+        except BlockingIOError:
+            # Send buffer full: drop this update, the next one is fresher
+            pass
+        except ConnectionRefusedError:
+            # ICMP port unreachable from an earlier packet: nobody is
+            # listening yet, which is not worth reporting per update
+            pass
+        except Exception as e:
+            print(f"MouthController: Error sending message: {e}")
 
-            if frame_to_play:
-                time_ms, position = frame_to_play
+    def apply_recorded_movement(self, current_time, times, values):
+        """Apply recorded mouth movements during playback
+
+        times holds the sorted frame timestamps and values one row per frame
+        of (position,).
+        """
+        if not self.joystick_enabled:  # Only apply during playback
+            # Latest frame with time <= current_time. Playback moves forward,
+            # so try the frame used last and the one after it before falling
+            # back to a binary search
+            idx = self._frame_idx
+            last = len(times) - 1
+            if 0 <= idx <= last and times[idx] <= current_time:
+                if idx < last and times[idx + 1] <= current_time:
+                    idx += 1
+                    if idx < last and times[idx + 1] <= current_time:
+                        idx = -1
+            else:
+                idx = -1
+            if idx < 0:
+                idx = int(np.searchsorted(times, current_time, side="right")) - 1
+            self._frame_idx = idx
+
+            if idx >= 0:
+                position = int(values[idx, 0])
                 if position != self.current_mouth_position:
                     self.current_mouth_position = position
-                    self.send_message(f"mouth,{position}")
-                    print(
-                        f"MouthController: Applied mouth frame at {current_time}ms: Position={position}"
-                    )
+                    self.send_mouth_position(position)
+                    if log.isEnabledFor(logging.DEBUG):
+                        log.debug(
+                            "MouthController: Applied mouth frame at %sms: Position=%s",
+                            current_time,
+                            position,
+                        )
 
     def cleanup(self):
         """Clean up resources"""
@@ -92,6 +202,11 @@ class MouthController:
         # Unsubscribe from joystick
         self.joystick_controller.unsubscribe(self._handle_joystick_update)
 
+        # Stop the flusher; a parked position is dropped with it
+        self._stop.set()
+        self._pending.set()
+        self._flusher_thread.join(timeout=0.1)
+
         # Close socket
         self.sock.close()
         print("MouthController: Cleanup complete")
@@ -1,6 +1,7 @@
 # settings.py
 import json
 import os
+import tempfile
 
 
 class Settings:
@@ -10,15 +11,20 @@ class Settings:
             "host": "127.0.0.1",
             "eye_port": 5005,
             "mouth_port": 5006,
+            "audio_buffer_samples": 4096,
+            "log_level": "INFO",
         }
         self.current_settings = {}
+        self._saved_settings = None  # What the file holds, to skip no-op saves
         self.load_settings()
 
     def load_settings(self):
         try:
             if os.path.exists(self.config_file):
                 with open(self.config_file, "r") as f:
-                    self.current_settings = json.load(f)
+                    # Fill in defaults once here, so lookups need no fallback
+                    self.current_settings = {**self.default_settings, **json.load(f)}
+                self._saved_settings = self.current_settings.copy()
             else:
                 self.current_settings = self.default_settings.copy()
                 self.save_settings()
@@ -27,15 +33,34 @@ class Settings:
             self.current_settings = self.default_settings.copy()
 
     def save_settings(self):
+        if self.current_settings == self._saved_settings:
+            return
+        # Write a temporary file next to the real one and rename it over, so
+        # a crash mid-write never leaves a truncated settings file behind
+        directory = os.path.dirname(os.path.abspath(self.config_file))
+        temp_name = None
         try:
-            with open(self.config_file, "w") as f:
+            with tempfile.NamedTemporaryFile(
+                "w", dir=directory, suffix=".tmp", delete=False
+            ) as f:
+                temp_name = f.name
                 json.dump(self.current_settings, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_name, self.config_file)
+            self._saved_settings = self.current_settings.copy()
         except Exception as e:
             print(f"Error saving settings: {e}")
+            if temp_name and os.path.exists(temp_name):
+                os.unlink(temp_name)
 
     def get_setting(self, key):
-        return self.current_settings.get(key, self.default_settings.get(key))
+        return self.current_settings.get(key)
 
     def update_setting(self, key, value):
-        self.current_settings[key] = value
+        self.update_settings(**{key: value})
+
+    def update_settings(self, **changes):
+        """Apply several changes and write the file once"""
+        self.current_settings.update(changes)
         self.save_settings()
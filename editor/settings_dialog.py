@@ -90,9 +90,11 @@ class SettingsDialog:
 
     def on_save(self):
         if self.validate_settings():
-            self.settings.update_setting("host", self.host_var.get().strip())
-            self.settings.update_setting("eye_port", int(self.eye_port_var.get()))
-            self.settings.update_setting("mouth_port", int(self.mouth_port_var.get()))
+            self.settings.update_settings(
+                host=self.host_var.get().strip(),
+                eye_port=int(self.eye_port_var.get()),
+                mouth_port=int(self.mouth_port_var.get()),
+            )
             self.dialog.destroy()
 
     def on_cancel(self):
@@ -3,6 +3,180 @@ from tkinter import ttk
 import numpy as np
 from pydub import AudioSegment
 import math
+import wave
+
+# Recorded points are drawn in batches of this many, as one polyline segment
+DRAW_BATCH = 10
+
+# Frame capacity of a new track, and the recording tick used to size tracks
+# up front for a known audio length
+TRACK_CAPACITY = 1024
+RECORD_INTERVAL_MS = 16
+
+# Waveform detail levels kept for the audio track, level k holding the
+# min/max of every 2**k samples (up to 65536 samples per bin)
+WAVEFORM_LODS = 17
+
+
+class FrameTrack:
+    """Growable struct-of-arrays store for timestamped animation frames
+
+    Timestamps live in one int64 array and the frame values in a matrix of
+    the given dtype (float64 unless the values fit something narrower), both
+    doubling in capacity when full, so playback can binary-search
+    the timestamps and drawing can work on whole columns. Rows still read back
+    as tuples of plain Python values, so a track can be iterated and indexed
+    like the list of frames it replaces.
+    """
+
+    def __init__(self, converters, capacity=TRACK_CAPACITY, dtype=np.float64):
+        # One converter per value column, applied when reading rows back
+        self._converters = converters
+        self._times = np.empty(capacity, dtype=np.int64)
+        self._values = np.empty((capacity, len(converters)), dtype=dtype)
+        self._size = 0
+
+    @property
+    def times(self):
+        """Timestamps of all frames, in recording order"""
+        return self._times[: self._size]
+
+    @property
+    def dtype(self):
+        """Storage type of the frame values"""
+        return self._values.dtype
+
+    @property
+    def values(self):
+        """Frame values, one row per frame and one column per value"""
+        return self._values[: self._size]
+
+    def reserve(self, capacity):
+        """Grow the buffers to hold at least capacity frames"""
+        if capacity > len(self._times):
+            self._times = np.resize(self._times, capacity)
+            self._values = np.resize(self._values, (capacity, self._values.shape[1]))
+
+    def append(self, time_ms, *values):
+        """Add a frame at the end of the track"""
+        size = self._size
+        if size == len(self._times):
+            self._times = np.resize(self._times, size * 2)
+            self._values = np.resize(self._values, (size * 2, self._values.shape[1]))
+        self._times[size] = time_ms
+        self._values[size] = values
+        self._size = size + 1
+
+    def extend(self, times, values):
+        """Add a block of frames at the end of the track in one copy"""
+        size = self._size
+        end = size + len(times)
+        if end > len(self._times):
+            self.reserve(max(end, size * 2))
+        self._times[size:end] = times
+        self._values[size:end] = values
+        self._size = end
+
+    def sort(self):
+        """Put the frames in time order, keeping the order of equal times
+
+        Recorded frames always arrive in order, so this only has work to do
+        for loaded files that were edited by hand.
+        """
+        times = self.times
+        if len(times) > 1 and (times[1:] < times[:-1]).any():
+            order = np.argsort(times, kind="stable")
+            self._times[: self._size] = times[order]
+            self._values[: self._size] = self.values[order]
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("frame index out of range")
+        values = self._values[index].tolist()
+        return (
+            int(self._times[index]),
+            *(convert(value) for convert, value in zip(self._converters, values)),
+        )
+
+    def __iter__(self):
+        # Convert whole columns at once and let zip build the row tuples, so
+        # saving a long take runs no Python code per frame. tolist() already
+        # gives ints for integer storage and floats for float storage, so
+        # only the other conversions (e.g. bool) need mapping.
+        kind = self._values.dtype.kind
+        values = self.values
+        columns = []
+        for i, convert in enumerate(self._converters):
+            column = values[:, i].tolist()
+            if not (
+                (convert is int and kind in "iu") or (convert is float and kind == "f")
+            ):
+                column = map(convert, column)
+            columns.append(column)
+        return zip(self.times.tolist(), *columns)
+
+
+def new_eye_track(capacity=TRACK_CAPACITY):
+    """Track of (time_ms, x, y, left_blink, right_blink, both_eyes) frames"""
+    return FrameTrack((float, float, bool, bool, bool), capacity)
+
+
+def new_mouth_track(capacity=TRACK_CAPACITY):
+    """Track of (time_ms, position) frames
+
+    Positions are the 0-255 byte sent on the wire, so they are kept as uint8.
+    """
+    return FrameTrack((int,), capacity, dtype=np.uint8)
+
+
+def build_waveform_lods(samples, levels=WAVEFORM_LODS):
+    """Min/max pyramid of samples, one (lo, hi) pair of arrays per level
+
+    Level 0 is the samples themselves and each level above halves the bin
+    count, so drawing at any zoom only has to reduce a few bins per pixel.
+    """
+    lo = hi = np.asarray(samples, dtype=np.float32)
+    lods = [(lo, hi)]
+    while len(lods) < levels and len(lo) > 1:
+        pairs = np.arange(0, len(lo), 2)
+        lo = np.minimum.reduceat(lo, pairs)
+        hi = np.maximum.reduceat(hi, pairs)
+        lods.append((lo, hi))
+    return lods
+
+
+def _read_pcm_wav(source):
+    """(samples, channels, sample_width, frame_rate) of a plain PCM WAV
+
+    Reads the frames straight into a NumPy view, with no ffmpeg process or
+    pydub copies. Returns None for anything the wave module can't decode or
+    whose sample width has no NumPy type, so the caller can use pydub.
+    """
+    try:
+        with wave.open(source, "rb") as wav:
+            channels = wav.getnchannels()
+            sample_width = wav.getsampwidth()
+            frame_rate = wav.getframerate()
+            raw_data = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError):
+        if hasattr(source, "seek"):
+            source.seek(0)
+        return None
+    if sample_width == 1:
+        # 8-bit WAV samples are unsigned, centred on 128
+        samples = np.frombuffer(raw_data, dtype=np.uint8).astype(np.int16) - 128
+    elif sample_width in (2, 4):
+        samples = np.frombuffer(raw_data, dtype=f"<i{sample_width}")
+    else:
+        if hasattr(source, "seek"):
+            source.seek(0)
+        return None
+    return samples, channels, sample_width, frame_rate
 
 
 class TimelineCanvas(tk.Canvas):
@@ -13,6 +187,10 @@ class TimelineCanvas(tk.Canvas):
 
         super().__init__(parent, height=height, bg="white", **kwargs)
 
+        # Canvas width, kept current by on_resize so drawing never has to
+        # query Tk for it
+        self._width = kwargs["width"]
+
         # Set minimum size
         self.configure(height=height)
 
@@ -43,14 +221,31 @@ class TimelineCanvas(tk.Canvas):
 
         # Data storage
         self.audio_data = None
-        self.eye_data = []
-        self.mouth_data = []
+        self._audio_lods = []  # See build_waveform_lods
+        self._audio_peak = 1.0  # Largest absolute sample, for scaling
+        self._audio_envelope = None  # (width, lo, hi) as last drawn
+        # Frames to preallocate per track, raised to fit the loaded audio
+        self._track_capacity = TRACK_CAPACITY
+        self.eye_data = new_eye_track()
+        self.mouth_data = new_mouth_track()
+        # How many frames of each track are already on the canvas
+        self._eye_drawn = 0
+        self._mouth_drawn = 0
+        self.max_time_ms = 0  # Timestamp of the last frame on either track
         self.duration_ms = 10000  # Start with 10 seconds
 
-        # Playback marker
+        # Per-frame diagnostics, toggled from the editor's menu
+        self.verbose = False
+
+        # Playback marker and the pixel column it currently sits at
         self.time_marker = self.create_line(
             0, 0, 0, height, fill="red", width=2, tags=("marker", "top"), state="normal"
         )
+        self._marker_px = 0
+
+        # One persistent polyline item per full-track line, by name; redraws
+        # move their coords instead of deleting and recreating them
+        self._lines = {}
 
         # Create tracks
         self.setup_tracks()
@@ -62,9 +257,7 @@ class TimelineCanvas(tk.Canvas):
         """Create track backgrounds, labels, and gridlines"""
         self.delete("track_bg", "track_label", "grid", "axis_label")
 
-        width = self.winfo_width()
-        if width == 0:
-            width = self.winfo_reqwidth()
+        width = self._width
 
         # Audio track
         y_audio = self.track_positions["audio"]
@@ -138,249 +331,515 @@ class TimelineCanvas(tk.Canvas):
         )
         self.create_text(5, y_mouth + 10, text="Mouth", anchor="w", tags="track_label")
 
-    def load_audio_file(self, file_path):
-        """Load audio file and extract waveform data using pydub"""
-        try:
-            # Load audio file using pydub
-            audio = AudioSegment.from_file(file_path)
-            self.duration_ms = len(audio)  # Update duration based on audio length
-
-            # Get raw audio data as bytes
-            raw_data = audio.raw_data
-
-            # Determine sample format
-            sample_width = audio.sample_width
-            sample_format = {1: np.int8, 2: np.int16, 4: np.int32}.get(sample_width)
-            if sample_format is None:
-                raise ValueError(f"Unsupported sample width: {sample_width}")
+        # The data lines persist across resizes, so keep the recreated
+        # backgrounds and labels underneath them
+        for tag in ("axis_label", "track_label", "grid", "track_bg"):
+            self.tag_lower(tag)
+
+    def _set_line(self, name, points, tag, fill, width):
+        """Show points on the persistent line item name, creating it once"""
+        item = self._lines.get(name)
+        if item is None:
+            item = self.create_line(0, 0, 0, 0, fill=fill, width=width, tags=tag)
+            self._lines[name] = item
+        if len(points) >= 4:
+            self.coords(item, points)
+            self.itemconfigure(item, state="normal")
+        else:
+            self.itemconfigure(item, state="hidden")
 
-            # Convert raw audio data to numpy array
-            audio_data = np.frombuffer(raw_data, dtype=sample_format)
+    def load_audio_file(self, file_path, audio_format=None):
+        """Load audio file and extract waveform data
 
-            # Handle stereo audio by selecting one channel or averaging channels
-            if audio.channels > 1:
-                audio_data = audio_data.reshape((-1, audio.channels))
-                audio_data = audio_data.mean(axis=1)  # Average the channels
+        PCM WAVs are read directly, anything else goes through pydub.
+        file_path may also be a file object, with audio_format naming its type.
+        """
+        try:
+            is_wav = audio_format == "wav" or (
+                audio_format is None
+                and isinstance(file_path, str)
+                and file_path.lower().endswith(".wav")
+            )
+            pcm = _read_pcm_wav(file_path) if is_wav else None
+            if pcm is not None:
+                audio_data, channels, sample_width, frame_rate = pcm
+                # Same rounding as len() of a pydub AudioSegment
+                duration_ms = round(1000 * len(audio_data) / channels / frame_rate)
+            else:
+                # Load audio file using pydub
+                audio = AudioSegment.from_file(file_path, format=audio_format)
+                duration_ms = len(audio)
+                channels = audio.channels
+                sample_width = audio.sample_width
+                frame_rate = audio.frame_rate
+
+                # Determine sample format; pydub has already made 8-bit
+                # samples signed, unlike the raw WAV path above
+                sample_format = {1: np.int8, 2: np.int16, 4: np.int32}.get(
+                    sample_width
+                )
+                if sample_format is None:
+                    raise ValueError(f"Unsupported sample width: {sample_width}")
+
+                # Convert raw audio data to numpy array
+                audio_data = np.frombuffer(audio.raw_data, dtype=sample_format)
+            self.duration_ms = duration_ms  # Update duration based on audio length
+
+            # Average the channels: sum them in integers wide enough not to
+            # overflow and fold the division into the normalize step, so the
+            # only full-length float array is the float32 result
+            if channels > 1:
+                sum_type = np.int64 if sample_width > 2 else np.int32
+                audio_data = audio_data.reshape((-1, channels))
+                audio_data = audio_data.sum(axis=1, dtype=sum_type)
 
             # Normalize audio data to range [-1.0, 1.0]
             max_int = float(2 ** (8 * sample_width - 1))
-            audio_data = audio_data / max_int
+            audio_data = np.multiply(
+                audio_data, 1.0 / (channels * max_int), dtype=np.float32
+            )
             self.audio_data = audio_data
-            self.frame_rate = audio.frame_rate
+            self.frame_rate = frame_rate
+
+            # Decimate once here so redraws at any width stay cheap
+            self._audio_lods = build_waveform_lods(audio_data)
+            self._audio_envelope = None
+            top_lo, top_hi = self._audio_lods[-1]
+            peak = max(-float(top_lo.min()), float(top_hi.max()))
+            self._audio_peak = peak or 1.0  # Prevent division by zero
 
             # After loading audio data, draw it
             self.draw_audio_data()
         except Exception as e:
             print(f"Error loading audio file: {e}")
             self.audio_data = None
+            self._audio_lods = []
+            self._audio_envelope = None
 
     def draw_audio_data(self):
         """Draw the audio waveform on the canvas"""
-        self.delete("audio_data")  # Remove any existing audio data drawings
-
         if self.audio_data is None or len(self.audio_data) == 0:
+            self.itemconfigure("audio_data", state="hidden")
             print("No audio data to draw")
             return
 
-        width = self.winfo_width()
-        if width == 0:
-            width = 800  # Default width if not yet set
+        width = self._width
 
         track_height = self.track_heights["audio"]
         y_base = self.track_positions["audio"]
         height = track_height
 
-        # Downsample audio data to fit the canvas width
-        n_samples = len(self.audio_data)
-        samples_per_pixel = max(n_samples // width, 1)
-        downsampled_data = self.audio_data[::samples_per_pixel]
+        # Pick the coarsest detail level that still has a bin per pixel and
+        # reduce its bins down to one min/max pair per pixel column. The
+        # result only depends on the width, so redraws at the same width
+        # (e.g. a height-only resize) reuse it.
+        envelope = self._audio_envelope
+        if envelope is not None and envelope[0] == width:
+            _, lo, hi = envelope
+        else:
+            n_samples = len(self.audio_data)
+            samples_per_pixel = max(n_samples // width, 1)
+            level = min(samples_per_pixel.bit_length() - 1, len(self._audio_lods) - 1)
+            lo, hi = self._audio_lods[level]
+            columns = min(width, len(lo))
+            bins = np.arange(columns) * len(lo) // columns
+            lo = np.minimum.reduceat(lo, bins)
+            hi = np.maximum.reduceat(hi, bins)
+            self._audio_envelope = (width, lo, hi)
+        columns = len(lo)
+
+        # Scale to the track height and zigzag between each column's extremes
+        scale = (height / 2) / self._audio_peak
+        y_mid = y_base + (height / 2)
+        xs = np.arange(columns)
+        points = np.column_stack((xs, y_mid - hi * scale, xs, y_mid - lo * scale))
+        points = points.ravel().tolist()
+
+        self._set_line("audio", points, "audio_data", self.colors["audio"], 1)
+
+    def _eye_points(self, start=0):
+        """Canvas coordinates of the X, Y and blink lines from frame start on"""
+        times = self.eye_data.times[start:]
+        values = self.eye_data.values[start:]
 
-        # Normalize downsampled data to fit the track height
-        max_amplitude = np.max(np.abs(downsampled_data))
-        if max_amplitude == 0:
-            max_amplitude = 1  # Prevent division by zero
+        track_height = self.track_heights["eyes"]
+        y_base = self.track_positions["eyes"]
 
-        normalized_data = (downsampled_data / max_amplitude) * (height / 2)
+        # Calculate x positions on timeline
+        canvas_x = times * self.pixels_per_ms
+
+        # Calculate y positions
+        y_x = y_base + (1 - values[:, 0]) * track_height
+        y_y = y_base + (1 - values[:, 1]) * track_height
+
+        # Handle blinks: both eyes at the top, one eye at a quarter height
+        blink_y = np.where(
+            values[:, 4] != 0,
+            y_base,
+            np.where(
+                (values[:, 2] != 0) | (values[:, 3] != 0),
+                y_base + (track_height * 0.25),
+                y_base + track_height,
+            ),
+        )
 
-        # Create points for the waveform
-        points = []
-        for i, sample in enumerate(normalized_data):
-            x = i
-            y = y_base + (height / 2) - sample
-            points.extend([x, y])
+        def interleave(ys):
+            return np.column_stack((canvas_x, ys)).ravel().tolist()
 
-        if len(points) > 2:
-            self.create_line(
-                *points, fill=self.colors["audio"], width=1, tags="audio_data"
-            )
+        return interleave(y_x), interleave(y_y), interleave(blink_y)
+
+    def _create_eye_lines(self, x_points, y_points, blink_points):
+        """Draw one tail segment per eye data type"""
+        tags = ("eye_data", "eye_tail")
+        self.create_line(*x_points, fill=self.colors["eye_x"], width=2, tags=tags)
+        self.create_line(*y_points, fill=self.colors["eye_y"], width=2, tags=tags)
+        self.create_line(*blink_points, fill=self.colors["blink"], width=2, tags=tags)
 
     def draw_eye_data(self):
         """Draw eye movement visualization"""
-        self.delete("eye_data")
+        # The full lines replace any tail segments drawn while recording
+        self.delete("eye_tail")
+        self._eye_drawn = len(self.eye_data)
 
         if not self.eye_data:
+            self.itemconfigure("eye_data", state="hidden")
             print("No eye data to draw")
             return
 
-        print(f"Drawing {len(self.eye_data)} points")
+        if self.verbose:
+            print(f"Drawing {len(self.eye_data)} points")
 
-        width = self.winfo_width()
-        if width == 0:
-            width = 800  # Default width if not yet set
+        x_points, y_points, blink_points = self._eye_points()
 
-        track_height = self.track_heights["eyes"]
-        y_base = self.track_positions["eyes"]
-
-        # Prepare points for each data type
-        x_points = []
-        y_points = []
-        blink_points = []
-
-        for time_ms, x, y, left_blink, right_blink, both_eyes in self.eye_data:
-            # Calculate x position on timeline
-            canvas_x = (
-                (time_ms / self.duration_ms) * width if self.duration_ms > 0 else 0
-            )
+        # Draw the lines
+        colors = self.colors
+        self._set_line("eye_x", x_points, "eye_data", colors["eye_x"], 2)
+        self._set_line("eye_y", y_points, "eye_data", colors["eye_y"], 2)
+        self._set_line("blink", blink_points, "eye_data", colors["blink"], 2)
+        if self.verbose:
+            print("Drew all graph lines")
 
-            # Calculate y positions
-            y_x = y_base + (1 - x) * track_height
-            y_y = y_base + (1 - y) * track_height
+    def _draw_eye_tail(self):
+        """Extend the eye lines with the frames added since the last draw"""
+        # Start from the last drawn frame so the segments join up
+        start = max(self._eye_drawn - 1, 0)
+        x_points, y_points, blink_points = self._eye_points(start)
+        self._eye_drawn = len(self.eye_data)
+        if len(x_points) > 2:
+            self._create_eye_lines(x_points, y_points, blink_points)
 
-            # Add points
-            x_points.extend([canvas_x, y_x])
-            y_points.extend([canvas_x, y_y])
+    def _mouth_points(self, start=0):
+        """Canvas coordinates of the mouth line from frame start on"""
+        times = self.mouth_data.times[start:]
+        positions = self.mouth_data.values[start:, 0]
 
-            # Handle blinks
-            if both_eyes:
-                blink_y = y_base
-            elif left_blink or right_blink:
-                blink_y = y_base + (track_height * 0.25)
-            else:
-                blink_y = y_base + track_height
-            blink_points.extend([canvas_x, blink_y])
+        track_height = self.track_heights.get("mouth", 50)
+        y_base = self.track_positions.get("mouth", 150)
 
-        # Draw the lines
-        if len(x_points) > 2:
-            self.create_line(
-                *x_points, fill=self.colors["eye_x"], width=2, tags="eye_data"
-            )
-            self.create_line(
-                *y_points, fill=self.colors["eye_y"], width=2, tags="eye_data"
-            )
-            self.create_line(
-                *blink_points, fill=self.colors["blink"], width=2, tags="eye_data"
-            )
-            print("Drew all graph lines")
+        canvas_x = times * self.pixels_per_ms
+        # Map position (0-255) to canvas y-coordinate within the track
+        canvas_y = y_base + (1 - positions / 255) * track_height
+        return np.column_stack((canvas_x, canvas_y)).ravel().tolist()
+
+    def _create_mouth_line(self, points):
+        """Draw a mouth tail segment"""
+        self.create_line(
+            *points,
+            fill=self.colors.get("mouth", "purple"),
+            width=2,
+            tags=("mouth_data", "mouth_tail"),
+        )
 
     def draw_mouth_data(self):
         """Draw mouth movement visualization"""
-        self.delete("mouth_data")  # Clear previous mouth data drawings
+        # The full line replaces any tail segments drawn while recording
+        self.delete("mouth_tail")
+        self._mouth_drawn = len(self.mouth_data)
 
         if not self.mouth_data:
+            self.itemconfigure("mouth_data", state="hidden")
             print("TimelineCanvas: No mouth data to draw")
             return
 
-        width = self.winfo_width()
-        if width == 1:  # Width is not properly set yet
-            width = self.winfo_reqwidth()
-            if width == 1:
-                width = 800  # Default width if necessary
-
-        duration_ms = self.duration_ms
-        if duration_ms == 0:
+        if self.duration_ms == 0:
+            self.itemconfigure("mouth_data", state="hidden")
             print("TimelineCanvas: Duration is zero, cannot draw mouth data")
             return
 
-        track_height = self.track_heights.get("mouth", 50)
-        y_base = self.track_positions.get("mouth", 150)
-
-        points = []
-        for time_ms, position in self.mouth_data:
-            canvas_x = (time_ms / duration_ms) * width
-            # Map position (0-255) to canvas y-coordinate within the track
-            normalized_value = position / 255  # 0.0 to 1.0
-            canvas_y = y_base + (1 - normalized_value) * track_height
-            points.extend([canvas_x, canvas_y])
+        points = self._mouth_points()
 
+        self._set_line(
+            "mouth", points, "mouth_data", self.colors.get("mouth", "purple"), 2
+        )
         if len(points) >= 4:
-            self.create_line(
-                *points,
-                fill=self.colors.get("mouth", "purple"),
-                width=2,
-                tags="mouth_data",
-            )
-            print("TimelineCanvas: Mouth data drawn on canvas")
+            if self.verbose:
+                print("TimelineCanvas: Mouth data drawn on canvas")
         else:
             print("TimelineCanvas: Not enough points to draw mouth data")
 
+    def _draw_mouth_tail(self):
+        """Extend the mouth line with the frames added since the last draw"""
+        # Start from the last drawn frame so the segments join up
+        start = max(self._mouth_drawn - 1, 0)
+        points = self._mouth_points(start)
+        self._mouth_drawn = len(self.mouth_data)
+        if len(points) >= 4:
+            self._create_mouth_line(points)
+
+    def flush_points(self):
+        """Draw any recorded frames still waiting for their batch to fill"""
+        if self._eye_drawn < len(self.eye_data):
+            self._draw_eye_tail()
+        if self._mouth_drawn < len(self.mouth_data):
+            self._draw_mouth_tail()
+
+    def _redraw_data(self):
+        """Redraw both data tracks, e.g. after the time scale changed"""
+        if self.eye_data:
+            self.draw_eye_data()
+        if self.mouth_data:
+            self.draw_mouth_data()
+
     def add_eye_data_point(self, time_ms, x, y, left_blink, right_blink, both_eyes):
         """Add eye movement data point and update visualization"""
-        print(f"Timeline: Adding point - Time: {time_ms}ms, X: {x:.3f}, Y: {y:.3f}")
+        if self.verbose:
+            print(f"Timeline: Adding point - Time: {time_ms}ms, X: {x:.3f}, Y: {y:.3f}")
 
         # Store the data point
-        self.eye_data.append([time_ms, x, y, left_blink, right_blink, both_eyes])
+        self.eye_data.append(time_ms, x, y, left_blink, right_blink, both_eyes)
+        if time_ms > self.max_time_ms:
+            self.max_time_ms = time_ms
 
-        # Extend timeline if needed
+        # Extend timeline if needed, which rescales everything drawn so far
         if time_ms > self.duration_ms:
             self.duration_ms = max(time_ms + 5000, 10000)
             print(f"Extended timeline duration to {self.duration_ms}ms")
-
-        # Draw immediately
-        self.draw_eye_data()
-        print(f"Drew graph with {len(self.eye_data)} points")
+            self._redraw_data()
+        elif len(self.eye_data) - self._eye_drawn >= DRAW_BATCH:
+            self._draw_eye_tail()
+            if self.verbose:
+                print(f"Drew graph with {len(self.eye_data)} points")
 
     def add_mouth_data_point(self, time_ms, position):
         """Add mouth movement data point and update visualization"""
-        self.mouth_data.append([time_ms, position])
-        print(
-            f"TimelineCanvas: Added mouth data point at {time_ms}ms, position {position}"
-        )
+        self.mouth_data.append(time_ms, position)
+        if time_ms > self.max_time_ms:
+            self.max_time_ms = time_ms
+        if self.verbose:
+            print(
+                f"TimelineCanvas: Added mouth data point at {time_ms}ms, position {position}"
+            )
 
-        # Update duration_ms if necessary
+        # Extend timeline if needed, which rescales everything drawn so far
         if time_ms > self.duration_ms:
-            self.duration_ms = time_ms
+            self.duration_ms = max(time_ms + 5000, 10000)
             print(f"TimelineCanvas: Updated duration_ms to {self.duration_ms}")
+            self._redraw_data()
+        elif len(self.mouth_data) - self._mouth_drawn >= DRAW_BATCH:
+            self._draw_mouth_tail()
+
+    def bulk_load_eye_data(self, frames):
+        """Append loaded EyeFrames in one block and draw them once"""
+        count = len(frames)
+        if not count:
+            return
+        times = np.fromiter((f.time_ms for f in frames), dtype=np.int64, count=count)
+        values = np.array(
+            [
+                (f.x, f.y, f.left_closed, f.right_closed, f.both_closed)
+                for f in frames
+            ],
+            dtype=np.float64,
+        )
+        self.eye_data.extend(times, values)
+        self.eye_data.sort()  # Playback binary-searches the times
+        self.max_time_ms = max(self.max_time_ms, int(times.max()))
+        if self._fit_duration(self.max_time_ms):
+            self._redraw_data()
+        else:
+            self.draw_eye_data()
 
-        self.draw_mouth_data()
+    def bulk_load_mouth_data(self, frames):
+        """Append loaded MouthFrames in one block and draw them once"""
+        count = len(frames)
+        if not count:
+            return
+        times = np.fromiter((f.time_ms for f in frames), dtype=np.int64, count=count)
+        # Read wide first: a hand-edited file may hold positions outside the
+        # 0-255 the uint8 track can store, and those are clamped, not fatal
+        positions = np.fromiter(
+            (f.position for f in frames), dtype=np.int64, count=count
+        )
+        clamped = np.count_nonzero((positions < 0) | (positions > 255))
+        if clamped:
+            print(f"Clamped {clamped} mouth positions outside 0-255")
+            np.clip(positions, 0, 255, out=positions)
+        self.mouth_data.extend(times, positions.reshape(-1, 1))
+        self.mouth_data.sort()  # Playback binary-searches the times
+        self.max_time_ms = max(self.max_time_ms, int(times.max()))
+        if self._fit_duration(self.max_time_ms):
+            self._redraw_data()
+        else:
+            self.draw_mouth_data()
+
+    def stream_load_data(self, rows):
+        """Append a stream of ("eye"/"mouth", frame) rows and draw them once
+
+        Frames go straight into the tracks as they arrive, so a long bundle
+        is never held as lists of frame objects on the way in.
+        """
+        eye_append = self.eye_data.append
+        mouth_append = self.mouth_data.append
+        clamped = 0
+        for kind, frame in rows:
+            if kind == "eye":
+                eye_append(
+                    frame.time_ms,
+                    frame.x,
+                    frame.y,
+                    frame.left_closed,
+                    frame.right_closed,
+                    frame.both_closed,
+                )
+            else:
+                position = frame.position
+                if not 0 <= position <= 255:
+                    clamped += 1
+                    position = min(max(position, 0), 255)
+                mouth_append(frame.time_ms, position)
+        if clamped:
+            print(f"Clamped {clamped} mouth positions outside 0-255")
+
+        # Playback binary-searches the times
+        self.eye_data.sort()
+        self.mouth_data.sort()
+        for track in (self.eye_data, self.mouth_data):
+            if len(track):
+                self.max_time_ms = max(self.max_time_ms, int(track.times.max()))
+        if self._fit_duration(self.max_time_ms):
+            self._redraw_data()
+        else:
+            self.draw_eye_data()
+            self.draw_mouth_data()
+
+    def _fit_duration(self, max_time_ms):
+        """Extend the timeline to show max_time_ms, True if it was rescaled"""
+        if max_time_ms <= self.duration_ms:
+            return False
+        self.duration_ms = max(max_time_ms + 5000, 10000)
+        return True
+
+    def add_both_data_point(
+        self, time_ms, x, y, left_blink, right_blink, both_eyes, position
+    ):
+        """Add an eye and a mouth frame recorded at the same time"""
+        self.eye_data.append(time_ms, x, y, left_blink, right_blink, both_eyes)
+        self.mouth_data.append(time_ms, position)
+        if time_ms > self.max_time_ms:
+            self.max_time_ms = time_ms
+
+        # Extend timeline if needed, which rescales everything drawn so far
+        if time_ms > self.duration_ms:
+            self.duration_ms = max(time_ms + 5000, 10000)
+            print(f"Extended timeline duration to {self.duration_ms}ms")
+            self._redraw_data()
+            return
+        if len(self.eye_data) - self._eye_drawn >= DRAW_BATCH:
+            self._draw_eye_tail()
+        if len(self.mouth_data) - self._mouth_drawn >= DRAW_BATCH:
+            self._draw_mouth_tail()
+
+    def time_to_x(self, time_ms):
+        """Pixel column of time_ms on the timeline"""
+        return int(time_ms * self.pixels_per_ms)
 
     def update_time_marker(self, time_ms):
         """Update playback position marker"""
         if self.duration_ms <= 0:
             self.duration_ms = 10000  # Default to 10 seconds if no duration set
 
-        # Calculate x position
-        width = self.winfo_width()
-        x_pos = (time_ms / self.duration_ms) * width
         # Update marker position
+        x_pos = self._marker_px = self.time_to_x(time_ms)
         self.coords(self.time_marker, x_pos, 0, x_pos, self.total_height)
         self.tag_raise(self.time_marker)  # Ensure marker stays on top
 
+    def move_time_marker(self, time_ms):
+        """Move the playback marker, only touching Tk when it changes column"""
+        x_pos = self.time_to_x(time_ms)
+        if x_pos != self._marker_px:
+            self.move(self.time_marker, x_pos - self._marker_px, 0)
+            self._marker_px = x_pos
+            self.tag_raise(self.time_marker)  # Ensure marker stays on top
+
     def clear_eye_data(self):
         """Clear eye movement data"""
-        self.eye_data = []
-        self.delete("eye_data")
+        self.eye_data = new_eye_track(self._track_capacity)
+        self._eye_drawn = 0
+        self._refresh_max_time()
+        self.delete("eye_tail")
+        self.itemconfigure("eye_data", state="hidden")
 
     def clear_mouth_data(self):
         """Clear mouth movement data"""
-        self.mouth_data = []
-        self.delete("mouth_data")
+        self.mouth_data = new_mouth_track(self._track_capacity)
+        self._mouth_drawn = 0
+        self._refresh_max_time()
+        self.delete("mouth_tail")
+        self.itemconfigure("mouth_data", state="hidden")
+
+    def _refresh_max_time(self):
+        """Recompute max_time_ms after a track was replaced"""
+        self.max_time_ms = max(
+            (
+                int(track.times.max())
+                for track in (self.eye_data, self.mouth_data)
+                if len(track)
+            ),
+            default=0,
+        )
 
     def clear_audio_data(self):
         """Clear audio waveform data"""
         self.audio_data = None
-        self.delete("audio_data")
+        self._audio_lods = []
+        self._audio_envelope = None
+        self.itemconfigure("audio_data", state="hidden")
 
     def set_audio_duration(self, duration_ms):
         """Set the timeline duration"""
         self.duration_ms = max(duration_ms, 10000)  # Minimum 10 seconds
 
+        # Size the tracks for a full-length recording with some headroom, so
+        # recording along with the audio never has to regrow them
+        self._track_capacity = max(
+            TRACK_CAPACITY, int(duration_ms / RECORD_INTERVAL_MS * 1.5)
+        )
+        self.eye_data.reserve(self._track_capacity)
+        self.mouth_data.reserve(self._track_capacity)
+
+    @property
+    def duration_ms(self):
+        """Timeline length in ms, setting it also updates pixels_per_ms"""
+        return self._duration_ms
+
+    @duration_ms.setter
+    def duration_ms(self, duration_ms):
+        self._duration_ms = duration_ms
+        self._update_scale()
+
+    def _update_scale(self):
+        """Recompute the ms to pixel scale after a duration or width change"""
+        if self._duration_ms > 0:
+            self.pixels_per_ms = self._width / self._duration_ms
+        else:
+            self.pixels_per_ms = 0.0
+
     def on_resize(self, event):
         """Handle window resize"""
+        self._width = event.width
+        self._update_scale()
         self.setup_tracks()
-        if self.eye_data:
-            self.draw_eye_data()
-        if self.mouth_data:
-            self.draw_mouth_data()
+        self._redraw_data()
         if self.audio_data is not None:
             self.draw_audio_data()
 
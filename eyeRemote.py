@@ -1,25 +1,50 @@
+import os
 import socket
 import time
 from inputs import devices, get_gamepad
 import math
 import threading
 import atexit
-import struct
 import csv
-from datetime import datetime, timedelta
-import queue
+from array import array
+from itertools import islice
+from datetime import datetime
 import argparse
 
+# Observed joystick ranges after normalize_joystick()
+JOY_X_MIN, JOY_X_MAX = 0, 0.00778198
+JOY_Y_MIN, JOY_Y_MAX = 0, 0.00778190
+
+# Recording column layout: one typed array per CSV column
+RECORD_HEADER = ['time_ms', 'eye_x', 'eye_y', 'left_eyelid', 'right_eyelid',
+                 'left_eye_closed', 'right_eye_closed']
+RECORD_TYPECODES = ('L', 'd', 'd', 'd', 'd', 'B', 'B')
+# Fixed capacity of the in-memory recording buffer; it is written out to the
+# CSV file whenever it fills up, so memory use does not grow with the take
+RECORD_CAPACITY = 500
+
+# Precomputed reciprocals so the hot path multiplies instead of divides
+_INV_32768 = 1.0 / 32768.0
+_INV_JOY_X_RANGE = 1.0 / (JOY_X_MAX - JOY_X_MIN)
+_INV_JOY_Y_RANGE = 1.0 / (JOY_Y_MAX - JOY_Y_MIN)
+
 
 class EyeRemote:
-    def __init__(self, ip, port):
+    def __init__(self, ip, port, verbose=False):
         self.UDP_IP = ip  # Replace with the IP of your eye device
         self.UDP_PORT = port  # Make sure this matches the port in your eye script
+        self.verbose = verbose  # Print every packet sent
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        # Never let a full send buffer stall the controller loop
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20)
+        self.sock.setblocking(False)
+        # Connect once so each packet is a plain send() to a cached route
+        self.sock.connect((self.UDP_IP, self.UDP_PORT))
 
-        self.record_queue = queue.Queue()
-        self.disk_writer_thread = None
-        self.recording_start_time = None
+        self.record_columns = self.new_record_columns()
+        self.record_count = 0
+        self.record_lock = threading.Lock()
+        self.recording_start_ns = None
 
         self.current_eye_x = 0
         self.current_eye_y = 0
@@ -42,8 +67,7 @@ class EyeRemote:
         self.is_recording = False
         self.record_file = None
         self.record_writer = None
-        self.last_state = {}
-        self.last_state_time = None
+        self.last_state_ns = None
 
     def encode_message(self, command, data=None):
         if command == "joystick_connected":
@@ -66,15 +90,15 @@ class EyeRemote:
             _, x, y = command.split(',')
             x_byte = int(float(x) * 255)
             y_byte = int(float(y) * 255)
-            return b'\x20' + struct.pack('BB', x_byte, y_byte)
+            return bytes((0x20, x_byte, y_byte))
         elif command.startswith("left_eyelid"):
             _, position = command.split(',')
             pos_byte = int(float(position) * 255)
-            return b'\x30' + struct.pack('B', pos_byte)
+            return bytes((0x30, pos_byte))
         elif command.startswith("right_eyelid"):
             _, position = command.split(',')
             pos_byte = int(float(position) * 255)
-            return b'\x31' + struct.pack('B', pos_byte)
+            return bytes((0x31, pos_byte))
         elif command == "blink_left_start":
             return b'\x40'
         elif command == "blink_left_end":
@@ -92,20 +116,25 @@ class EyeRemote:
 
     def send_message(self, message):
         encoded_message = self.encode_message(message)
-        self.sock.sendto(encoded_message, (self.UDP_IP, self.UDP_PORT))
-        print(f"Sent: {message} (encoded: {encoded_message.hex()})")
+        try:
+            self.sock.send(encoded_message)
+        except BlockingIOError:
+            # Send buffer full: drop this update, the next one is fresher
+            return
+        except ConnectionRefusedError:
+            # ICMP port unreachable from an earlier packet: the eye script
+            # isn't listening (yet), keep going
+            return
+        if self.verbose:
+            print(f"Sent: {message} (encoded: {encoded_message.hex()})")
 
     def normalize_joystick(self, value):
-        return value / 32768.0  # This converts the raw value to a range of -1 to 1
+        return value * _INV_32768  # This converts the raw value to a range of -1 to 1
 
     def set_joystick(self, x, y):
-        # Define the observed ranges
-        x_min, x_max = 0, 0.00778198
-        y_min, y_max = 0, 0.00778190
-
-        # Map the joystick range to 0 to 1 range
-        eye_x = round((x - x_min) / (x_max - x_min), 2)
-        eye_y = round(1 - (y - y_min) / (y_max - y_min), 2)  # Invert Y axis
+        # Map the observed joystick range to 0 to 1 range
+        eye_x = round((x - JOY_X_MIN) * _INV_JOY_X_RANGE, 2)
+        eye_y = round(1 - (y - JOY_Y_MIN) * _INV_JOY_Y_RANGE, 2)  # Invert Y axis
 
         # Ensure the values stay within the 0 to 1 range
         eye_x = max(min(eye_x, 1), 0)
@@ -120,7 +149,7 @@ class EyeRemote:
 
     def set_eyelids(self, position):
         # Convert the -1 to 1 range to the 0 to 1 range expected by the eye script
-        eyelid_position = round((position + 1) / 2, 2)
+        eyelid_position = round(position * 0.5 + 0.5, 2)
 
         if eyelid_position != self.current_left_eyelid or eyelid_position != self.current_right_eyelid:
             self.send_message(f"left_eyelid,{eyelid_position}")
@@ -200,21 +229,47 @@ class EyeRemote:
             print(
                 "No compatible controller detected. Please connect an Xbox or PS4 controller.")
 
+    def set_realtime_priority(self):
+        # Best effort: SCHED_FIFO needs CAP_SYS_NICE and only exists on Linux
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(20))
+        except (AttributeError, OSError):
+            pass
+
     def gamepad_reader(self):
+        # Event driven: get_gamepad() blocks until the pad reports, and each
+        # report is acted on straight away instead of waiting for a polling
+        # tick to pick up the new state
+        self.set_realtime_priority()
+
         last_share_state = 0
+        last_x = 0
+        last_y = 0
+        last_eyelid_position = 0
+        last_left_blink_state = 0
+        last_right_blink_state = 0
+        last_both_blink_state = 0
+
+        # Hoist attribute lookups out of the loop; the dict is updated in place
+        state = self.gamepad_state
+        set_joystick = self.set_joystick
+        set_eyelids = self.set_eyelids
+        start_blink = self.start_blink
+        end_blink = self.end_blink
+
         while True:
             events = get_gamepad()
             for event in events:
-                if event.code in self.gamepad_state:
-                    self.gamepad_state[event.code] = event.state
+                if event.code in state:
+                    state[event.code] = event.state
                 elif event.code == "ABS_X":
-                    self.gamepad_state["LX"] = event.state
+                    state["LX"] = event.state
                 elif event.code == "ABS_Y":
-                    self.gamepad_state["LY"] = event.state
+                    state["LY"] = event.state
                 elif event.code == "ABS_RX":
-                    self.gamepad_state["RX"] = event.state
+                    state["RX"] = event.state
                 elif event.code == "ABS_RY":
-                    self.gamepad_state["RY"] = event.state
+                    state["RY"] = event.state
 
                 # Check for SHARE button press (BTN_SELECT)
                 if event.code == "BTN_SELECT":
@@ -227,57 +282,47 @@ class EyeRemote:
                             self.start_recording()
                     last_share_state = event.state
 
-    def eye_controller(self):
-        last_x = 0
-        last_y = 0
-        last_eyelid_position = 0
-        last_left_blink_state = 0
-        last_right_blink_state = 0
-        last_both_blink_state = 0
+            if not (self.controller_type and self.joystick_connected):
+                continue
 
-        while True:
-            if self.controller_type and self.joystick_connected:
-                x = self.normalize_joystick(self.gamepad_state["LX"])
-                y = self.normalize_joystick(self.gamepad_state["LY"])
-
-                if x != last_x or y != last_y:
-                    self.set_joystick(x, y)
-                    last_x = x
-                    last_y = y
-
-                eyelid_position = self.normalize_joystick(
-                    self.gamepad_state["RY"])
-
-                if eyelid_position != last_eyelid_position:
-                    self.set_eyelids(eyelid_position)
-                    last_eyelid_position = eyelid_position
-
-                left_blink_state = self.gamepad_state["BTN_WEST"]
-                right_blink_state = self.gamepad_state["BTN_EAST"]
-                both_blink_state = self.gamepad_state["BTN_SOUTH"]
-
-                if left_blink_state != last_left_blink_state:
-                    if left_blink_state == 1:
-                        self.start_blink('left')
-                    else:
-                        self.end_blink('left')
-                    last_left_blink_state = left_blink_state
-
-                if right_blink_state != last_right_blink_state:
-                    if right_blink_state == 1:
-                        self.start_blink('right')
-                    else:
-                        self.end_blink('right')
-                    last_right_blink_state = right_blink_state
-
-                if both_blink_state != last_both_blink_state:
-                    if both_blink_state == 1:
-                        self.start_blink('both')
-                    else:
-                        self.end_blink('both')
-                    last_both_blink_state = both_blink_state
-
-            time.sleep(0.01)
+            x = state["LX"] * _INV_32768
+            y = state["LY"] * _INV_32768
+
+            if x != last_x or y != last_y:
+                set_joystick(x, y)
+                last_x = x
+                last_y = y
+
+            eyelid_position = state["RY"] * _INV_32768
+
+            if eyelid_position != last_eyelid_position:
+                set_eyelids(eyelid_position)
+                last_eyelid_position = eyelid_position
+
+            left_blink_state = state["BTN_WEST"]
+            right_blink_state = state["BTN_EAST"]
+            both_blink_state = state["BTN_SOUTH"]
+
+            if left_blink_state != last_left_blink_state:
+                if left_blink_state == 1:
+                    start_blink('left')
+                else:
+                    end_blink('left')
+                last_left_blink_state = left_blink_state
+
+            if right_blink_state != last_right_blink_state:
+                if right_blink_state == 1:
+                    start_blink('right')
+                else:
+                    end_blink('right')
+                last_right_blink_state = right_blink_state
+
+            if both_blink_state != last_both_blink_state:
+                if both_blink_state == 1:
+                    start_blink('both')
+                else:
+                    end_blink('both')
+                last_both_blink_state = both_blink_state
 
     def start_recording(self):
         if not self.is_recording:
@@ -285,98 +330,95 @@ class EyeRemote:
             filename = f"eye_recording_{timestamp}.csv"
             self.record_file = open(filename, 'w', newline='')
             self.record_writer = csv.writer(self.record_file)
-            self.record_writer.writerow(['time_ms', 'eye_x', 'eye_y',
-                                        'left_eyelid', 'right_eyelid', 'left_eye_closed', 'right_eye_closed'])
+            self.record_writer.writerow(RECORD_HEADER)
+            self.record_count = 0
             self.is_recording = True
-            self.last_state = {}
-            self.recording_start_time = datetime.now()
-            self.last_state_time = self.recording_start_time
-
-            # Start the disk writer thread
-            self.disk_writer_thread = threading.Thread(
-                target=self.disk_writer, daemon=True)
-            self.disk_writer_thread.start()
+            self.recording_start_ns = time.monotonic_ns()
+            self.last_state_ns = self.recording_start_ns
 
             print(f"Recording started: {filename}")
 
     def stop_recording(self):
         if self.is_recording:
-            self.is_recording = False
-
-            # Wait for the disk writer thread to finish processing
-            if self.disk_writer_thread is not None:
-                self.disk_writer_thread.join()
-                self.disk_writer_thread = None
-
-            self.record_file.close()
+            # Write out whatever is still buffered, no thread to wait for
+            with self.record_lock:
+                self.is_recording = False
+                self.flush_recording()
+                self.record_file.close()
             print("Recording stopped")
 
     def record_state_change(self):
         if not self.is_recording:
             return
 
-        current_time = datetime.now()
-        current_state = {
-            'eye_x': self.current_eye_x,
-            'eye_y': self.current_eye_y,
-            'left_eyelid': self.current_left_eyelid,
-            'right_eyelid': self.current_right_eyelid,
-            'left_eye_closed': self.left_eye_closed,
-            'right_eye_closed': self.right_eye_closed
-        }
-
-        # Calculate the time since recording started
-        time_ms = int(
-            (current_time - self.recording_start_time).total_seconds() * 1000)
-
-        # Put the state change into the queue
-        self.record_queue.put([
-            time_ms,
-            current_state['eye_x'],
-            current_state['eye_y'],
-            current_state['left_eyelid'],
-            current_state['right_eyelid'],
-            current_state['left_eye_closed'],
-            current_state['right_eye_closed']
-        ])
-
-        self.last_state = current_state
-        self.last_state_time = current_time
+        current_ns = time.monotonic_ns()
+
+        # Calculate the time since recording started, in integer ms
+        time_ms = (current_ns - self.recording_start_ns) // 1_000_000
+
+        # Store the state change column-wise into the preallocated slots, no
+        # per-row objects. The lock only guards against stop_recording()
+        # closing the file mid-write.
+        with self.record_lock:
+            if not self.is_recording:
+                return
+            times, eye_x, eye_y, left_lid, right_lid, left_closed, right_closed = \
+                self.record_columns
+            i = self.record_count
+            times[i] = time_ms
+            eye_x[i] = self.current_eye_x
+            eye_y[i] = self.current_eye_y
+            left_lid[i] = self.current_left_eyelid
+            right_lid[i] = self.current_right_eyelid
+            left_closed[i] = self.left_eye_closed
+            right_closed[i] = self.right_eye_closed
+            self.record_count = i + 1
+            if self.record_count == RECORD_CAPACITY:
+                self.flush_recording()
+
+        self.last_state_ns = current_ns
 
     def replay_recording(self, filename, loop=False, freeze=False):
         print(f"Replaying recording: {filename}")
+        # Parse the whole file up front so the timed loop only sends
+        with open(filename, 'r') as file:
+            frames = [(int(row['time_ms']),
+                       float(row['eye_x']), float(row['eye_y']),
+                       float(row['left_eyelid']),
+                       row['left_eye_closed'] == 'True',
+                       row['right_eye_closed'] == 'True')
+                      for row in csv.DictReader(file)]
         last_state = None
         while True:
-            with open(filename, 'r') as file:
-                reader = csv.DictReader(file)
-                last_time = 0
-                for row in reader:
-                    current_time = int(row['time_ms'])
+            # Frames are due at absolute times from the start of each pass,
+            # so time spent sending never accumulates as drift
+            start_ns = time.monotonic_ns()
+            for frame in frames:
+                time_ms, eye_x, eye_y, eyelid, left_closed, right_closed = frame
 
-                    time_diff = (current_time - last_time) / \
-                        1000  # Convert to seconds
-                    time.sleep(time_diff)
+                delay_ns = start_ns + time_ms * 1_000_000 - time.monotonic_ns()
+                if delay_ns > 0:
+                    time.sleep(delay_ns / 1e9)
 
-                    # Send eye position
-                    self.set_joystick(float(row['eye_x']), float(row['eye_y']))
+                # Send eye position
+                self.set_joystick(eye_x, eye_y)
 
-                    # Send eyelid position
-                    # Assuming left and right are the same
-                    self.set_eyelids(float(row['left_eyelid']))
+                # Send eyelid position
+                # Assuming left and right are the same
+                self.set_eyelids(eyelid)
 
-                    # Handle eye blink states
-                    if row['left_eye_closed'] == 'True':
-                        self.start_blink('left')
-                    else:
-                        self.end_blink('left')
+                # Handle eye blink states
+                if left_closed:
+                    self.start_blink('left')
+                else:
+                    self.end_blink('left')
 
-                    if row['right_eye_closed'] == 'True':
-                        self.start_blink('right')
-                    else:
-                        self.end_blink('right')
+                if right_closed:
+                    self.start_blink('right')
+                else:
+                    self.end_blink('right')
 
-                    last_time = current_time
-                    last_state = row
+                last_state = frame
 
             if not loop:
                 break
@@ -385,14 +427,14 @@ class EyeRemote:
 
         if freeze and last_state:
             print("Freezing final state...")
-            self.set_joystick(
-                float(last_state['eye_x']), float(last_state['eye_y']))
-            self.set_eyelids(float(last_state['left_eyelid']))
-            if last_state['left_eye_closed'] == 'True':
+            _, eye_x, eye_y, eyelid, left_closed, right_closed = last_state
+            self.set_joystick(eye_x, eye_y)
+            self.set_eyelids(eyelid)
+            if left_closed:
                 self.start_blink('left')
             else:
                 self.end_blink('left')
-            if last_state['right_eye_closed'] == 'True':
+            if right_closed:
                 self.start_blink('right')
             else:
                 self.end_blink('right')
@@ -421,15 +463,11 @@ class EyeRemote:
         print("SHARE: Start/Stop recording")
         print("Press Ctrl+C to exit")
 
-        # Start the gamepad reader thread
+        # Start the gamepad reader thread, which also drives the eyes
         gamepad_thread = threading.Thread(
             target=self.gamepad_reader, daemon=True)
         gamepad_thread.start()
 
-        # Start the eye controller thread
-        eye_thread = threading.Thread(target=self.eye_controller, daemon=True)
-        eye_thread.start()
-
         # Main loop for handling program exit
         try:
             while True:
@@ -438,16 +476,20 @@ class EyeRemote:
             print("Exiting...")
             self.cleanup()
 
-    def disk_writer(self):
-        while self.is_recording or not self.record_queue.empty():
-            try:
-                # Wait for a state change to be available in the queue
-                state_change = self.record_queue.get(timeout=0.1)
-                # Write the state change to the CSV file
-                self.record_writer.writerow(state_change)
-                self.record_queue.task_done()
-            except queue.Empty:
-                continue
+    def new_record_columns(self):
+        return tuple(array(typecode, [0]) * RECORD_CAPACITY
+                     for typecode in RECORD_TYPECODES)
+
+    def flush_recording(self):
+        # Write the filled rows in a single batch and reuse the buffer.
+        # Callers hold record_lock.
+        count = self.record_count
+        times, eye_x, eye_y, left_lid, right_lid, left_closed, right_closed = \
+            self.record_columns
+        self.record_writer.writerows(islice(zip(
+            times, eye_x, eye_y, left_lid, right_lid,
+            map(bool, left_closed), map(bool, right_closed)), count))
+        self.record_count = 0
 
     def cleanup(self):
         print("\nDisconnecting joystick and exiting...")
@@ -469,13 +511,15 @@ def main():
         "-i", "--ip", help="IP address of the eye device", default="127.0.0.1")
     parser.add_argument(
         "-p", "--port", help="Port of the eye device", type=int, default=5005)
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="Print every packet sent")
     args = parser.parse_args()
 
     print("\033[92m")
     print("Eye Remote Control")
     print("Sending UDP to", args.ip, "port", args.port)
     print("\033[0m")
-    controller = EyeRemote(args.ip, args.port)
+    controller = EyeRemote(args.ip, args.port, args.verbose)
 
     if args.replay:
         controller.replay_recording(args.replay, args.loop, args.freeze)